@@ -1,8 +1,25 @@
+import os
+
 import streamlit as st
 import pandas as pd
 from PIL import Image
-import psycopg2
-from psycopg2.extras import RealDictCursor
+
+from db_pool import ConnectionPool
+from mcrs_cache import CatalogCache
+from mcrs_search import (
+    PAGE_SIZE, RESULT_COLUMNS, PostgresEngine, SQLiteEngine, count_reports, distinct_values, fetch_page, page_key,
+    pg_connect
+)
+
+# "sql": filter dan paging dijalankan di database per rerun.
+# "index": katalog dimuat sekali, di-refresh inkremental di background, lalu dicari
+# lewat index di memori (token/trigram + mask).
+SEARCH_MODE = os.environ.get("MCRS_SEARCH_MODE", "sql")
+
+# Umur cache (detik) untuk hasil query (mode sql) / snapshot katalog (mode index)
+CACHE_TTL = int(os.environ.get("MCRS_CACHE_TTL", "300"))
+
+POOL_SIZE = 4
 
 # Load and display logo
 image_path = r"C:/Users/....../Documents/Coding/Muamalat/MCRS/Logo Muamalat.png"
@@ -27,94 +44,124 @@ DB_CONFIG = {
     "password": ".....",
 }
 
-# SQL Query
-query = """
-SELECT 
-    a.emp_id, 
-    b.report_code, 
-    b.report_name, 
-    b.report_description, 
-    b.report_extension, 
-    b.document_pathkey, 
-    b.report_owner_name,
-    c.status as status_employee,
-    a.status_login, 
-    a.last_login_date, 
-    a.level_name, 
-    a.group_name, 
-    b.div_code, 
-    b.div_name, 
-    a.title
-FROM 
-    v_user_info a
-LEFT JOIN 
-    v_report_item b 
-ON 
-    a.emp_id = b.report_owner_nik
-join
-	t_dim_user_employee_vito c
-on
-	b.report_owner_nik = CAST(c.nik as TEXT)
-"""
-
-# Fetch data
-@st.cache_data(show_spinner=True)
-def fetch_data():
-    try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
-            df = pd.read_sql_query(query, conn)
-        return df
-    except Exception as e:
-        st.error(f"Error connecting to database: {e}")
-        return pd.DataFrame()
-
-# Load data
-df = fetch_data()
-
-if df.empty:
+def get_engine():
+    # MCRS_LOCAL_DATA=<file.csv|file.parquet>: pakai engine SQLite di memori (tanpa database live)
+    local_data = os.environ.get("MCRS_LOCAL_DATA")
+    if local_data:
+        df = pd.read_parquet(local_data) if local_data.endswith(".parquet") else pd.read_csv(local_data)
+        return SQLiteEngine.from_frame(df)
+    return PostgresEngine(ConnectionPool(lambda: pg_connect(DB_CONFIG), size=POOL_SIZE))
+
+
+@st.cache_resource
+def load_engine():
+    return get_engine()
+
+
+# Hasil query di-cache per kombinasi filter / halaman
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_choices(_engine, column):
+    return distinct_values(_engine, column)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_count(_engine, search, report_name, choices):
+    return count_reports(_engine, search, report_name, dict(choices))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=True)
+def cached_page(_engine, search, report_name, choices, page_size, after):
+    return fetch_page(_engine, search, report_name, dict(choices), page_size, after)
+
+
+@st.cache_resource
+def load_catalog_cache(_engine):
+    # Satu cache per proses; snapshot di dalamnya yang di-refresh (bukan cache_resource-nya)
+    return CatalogCache(_engine, ttl=CACHE_TTL)
+
+
+engine = load_engine()
+
+try:
+    if SEARCH_MODE == "index":
+        catalog = load_catalog_cache(engine)
+        with st.spinner("Memuat katalog MCRS..."):
+            snapshot = catalog.get()
+        search_index = snapshot.index
+        group_options = search_index.choices("group_name")
+        extension_options = search_index.choices("report_extension")
+    else:
+        group_options = cached_choices(engine, "group_name")
+        extension_options = cached_choices(engine, "report_extension")
+except Exception as e:
+    st.error(f"Error connecting to database: {e}")
+    st.stop()
+
+# Sidebar Filters
+st.sidebar.header("Cari Report")
+search_query = st.sidebar.text_input("Masukkan Report Name / Owner NIK / Owner Name / Report Description:", "")
+selected_report_group = st.sidebar.selectbox("Report Group Name", ["All"] + group_options)
+selected_report_extension = st.sidebar.selectbox("Report Extension", ["All"] + extension_options)
+selected_report_name = st.sidebar.text_input("Masukkan Report Name / Code untuk filter (Opsional):", "")
+
+# Dropdown filter for status_employee
+status_options = ["All", "ACTIVE", "INACTIVE"]
+selected_status = st.sidebar.selectbox("Status Employee", status_options)
+
+page_size = st.sidebar.selectbox("Baris per halaman", [50, PAGE_SIZE, 250, 500], index=1)
+
+if SEARCH_MODE == "index":
+    with st.sidebar.expander("Status cache katalog"):
+        st.caption(f"{len(snapshot.df)} baris, umur snapshot {snapshot.age:.0f} detik (TTL {CACHE_TTL})")
+        st.json(catalog.metrics.as_dict())
+        if st.button("Reload penuh"):
+            catalog.refresh_async(full=True)
+
+choices = (
+    ("group_name", selected_report_group),
+    ("report_extension", selected_report_extension),
+    ("status_employee", selected_status),
+)
+
+# Keyset (mode sql) / offset (mode index) tiap halaman yang sudah dibuka; direset setiap kali filter berubah
+filter_state = (search_query, selected_report_name, choices, page_size)
+if st.session_state.get("mcrs_filter_state") != filter_state:
+    st.session_state.mcrs_filter_state = filter_state
+    st.session_state.mcrs_page_keys = [None]
+
+page_keys = st.session_state.mcrs_page_keys
+page_number = len(page_keys)
+
+try:
+    if SEARCH_MODE == "index":
+        # Hasil teks diurutkan berdasarkan relevansi
+        ids = search_index.search(search_query, selected_report_name, dict(choices))
+        total = len(ids)
+        offset = page_keys[-1] or 0
+        page = search_index.page(ids, offset, page_size)
+        next_key = offset + page_size
+    else:
+        total = cached_count(engine, search_query, selected_report_name, choices)
+        page = cached_page(engine, search_query, selected_report_name, choices, page_size, page_keys[-1])
+        next_key = page_key(page)
+except Exception as e:
+    st.error(f"Error connecting to database: {e}")
+    st.stop()
+
+if total == 0:
     st.error("No data available to display.")
 else:
-    # Display all data in expander
-    with st.expander("Klik untuk melihat semua report"):
-        st.dataframe(df)
-
-    # Sidebar Filters
-    st.sidebar.header("Cari Report")
-    search_query = st.sidebar.text_input("Masukkan Report Name / Owner NIK / Owner Name / Report Description:", "")
-    selected_report_group = st.sidebar.selectbox("Report Group Name", ["All"] + df["group_name"].dropna().unique().tolist())
-    selected_report_extension = st.sidebar.selectbox("Report Extension", ["All"] + df["report_extension"].dropna().unique().tolist())
-    selected_report_name = st.sidebar.text_input("Masukkan Report Name / Code untuk filter (Opsional):", "")
-
-    # Dropdown filter for status_employee
-    status_options = ["All", "ACTIVE", "INACTIVE"]
-    selected_status = st.sidebar.selectbox("Status Employee", status_options)
-
-    # Apply Filters
-    df_filtered = df.copy()
-    
-    if search_query:
-        df_filtered = df_filtered[
-            df_filtered["report_name"].str.contains(search_query, case=False, na=False) |
-            df_filtered["report_code"].str.contains(search_query, case=False, na=False) |
-            df_filtered["report_owner_name"].str.contains(search_query, case=False, na=False) |
-            df_filtered["report_description"].str.contains(search_query, case=False, na=False)
-        ]
-
-    if selected_report_group != "All":
-        df_filtered = df_filtered[df_filtered["group_name"] == selected_report_group]
-
-    if selected_report_extension != "All":
-        df_filtered = df_filtered[df_filtered["report_extension"] == selected_report_extension]
-
-    if selected_report_name:
-        df_filtered = df_filtered[
-            df_filtered["report_name"].str.contains(selected_report_name, case=False, na=False) |
-            df_filtered["report_code"].str.contains(selected_report_name, case=False, na=False)
-        ]
-
-    if selected_status != "All":
-        df_filtered = df_filtered[df_filtered["status_employee"] == selected_status]
-
     # Display filtered results
+    n_pages = -(-total // page_size)
     st.write("### Hasil Pencarian")
-    st.dataframe(df_filtered)
+    st.caption(f"{total} baris, halaman {page_number} dari {n_pages}")
+    # row_seq hanya untuk keyset, tidak ditampilkan
+    st.dataframe(page[RESULT_COLUMNS])
+
+    col_prev, col_next = st.columns(2)
+    if col_prev.button("Sebelumnya", disabled=page_number == 1):
+        page_keys.pop()
+        st.rerun()
+    if col_next.button("Berikutnya", disabled=page_number >= n_pages or len(page) < page_size):
+        page_keys.append(next_key)
+        st.rerun()
@@ -0,0 +1,95 @@
+from operator import itemgetter
+
+import pandas as pd
+import pyarrow as pa
+
+# Mapping tipe JDBC (nama di DBAPITypeObject jaydebeapi) -> tipe Arrow.
+# jaydebeapi mengembalikan DATE/TIMESTAMP sebagai string dan DECIMAL/NUMERIC sebagai
+# float; nilai itu di-cast per kolom di Arrow, tidak lewat object dtype pandas.
+_INTEGER_TYPES = {"BIGINT", "INTEGER", "SMALLINT", "TINYINT"}
+_FLOAT_TYPES = {"DOUBLE", "FLOAT", "REAL"}
+_DECIMAL_TYPES = {"DECIMAL", "NUMERIC"}
+_STRING_TYPES = {"CHAR", "VARCHAR", "NCHAR", "NVARCHAR", "LONGVARCHAR", "LONGNVARCHAR", "CLOB", "NCLOB"}
+
+
+def _type_names(type_code):
+    if type_code is None:
+        return set()
+    values = getattr(type_code, "values", None)
+    if values:
+        return {str(value).upper() for value in values}
+    return {str(type_code).upper()}
+
+
+def arrow_type_from_description(desc):
+    # desc = satu entry cursor.description (DB-API): name, type_code, ..., precision, scale
+    names = _type_names(desc[1] if len(desc) > 1 else None)
+    precision = desc[4] if len(desc) > 4 else None
+    scale = desc[5] if len(desc) > 5 else None
+
+    if "TIMESTAMP" in names:
+        return pa.timestamp("us")
+    if "DATE" in names:
+        return pa.date32()
+    if "TIME" in names:
+        return pa.time64("us")
+    if names & _DECIMAL_TYPES:
+        if precision and 0 < precision <= 38 and scale is not None and 0 <= scale <= precision:
+            return pa.decimal128(precision, scale)
+        return pa.float64()
+    if names & _FLOAT_TYPES:
+        return pa.float64()
+    if names & _INTEGER_TYPES and "BOOLEAN" not in names and "BIT" not in names:
+        return pa.int64()
+    if names & _STRING_TYPES:
+        return pa.string()
+    # Tipe tidak dikenal (atau grup NUMBER jaydebeapi yang juga berisi BOOLEAN): infer dari nilai
+    return None
+
+
+def arrow_types_from_description(description):
+    return [(desc[0], arrow_type_from_description(desc)) for desc in description]
+
+
+def _source_type(values, arrow_type):
+    # Tipe Arrow dari nilai mentah driver sebelum di-cast ke tipe target
+    sample = next((value for value in values if value is not None), None)
+    if isinstance(sample, str) and not pa.types.is_string(arrow_type):
+        return pa.string()
+    if isinstance(sample, float) and pa.types.is_decimal(arrow_type):
+        return pa.float64()
+    return arrow_type
+
+
+def _column_array(values, arrow_type):
+    if arrow_type is None:
+        return pa.array(values, from_pandas=True)
+    source_type = _source_type(values, arrow_type)
+    try:
+        array = pa.array(values, type=source_type, from_pandas=True)
+        return array if source_type == arrow_type else array.cast(arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError, TypeError, ValueError):
+        # Nilai tidak sesuai metadata: biarkan Arrow meng-infer tipenya
+        return pa.array(values, from_pandas=True)
+
+
+def pandas_rows_to_table(rows, columns):
+    # Jalur lama (row tuple -> DataFrame -> Arrow), dipakai sebagai fallback
+    return pa.Table.from_pandas(pd.DataFrame.from_records(rows, columns=columns), preserve_index=False)
+
+
+def rows_to_arrow(rows, column_types):
+    # Bangun tabel Arrow kolom per kolom dari row tuple hasil fetchmany.
+    # column_types: hasil arrow_types_from_description(cursor.description)
+    names = [name for name, _ in column_types]
+    if not rows:
+        return pa.Table.from_arrays(
+            [pa.array([], type=arrow_type or pa.null()) for _, arrow_type in column_types], names=names
+        )
+    try:
+        # Ambil satu kolom sekaligus (lebih murah daripada zip(*rows) untuk batch besar)
+        arrays = [_column_array(list(map(itemgetter(j), rows)), arrow_type)
+                  for j, (_, arrow_type) in enumerate(column_types)]
+        return pa.Table.from_arrays(arrays, names=names)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError, ValueError):
+        return pandas_rows_to_table(rows, names)
@@ -0,0 +1,100 @@
+# Benchmark konversi batch fetchmany -> Arrow: jalur pandas lama vs arrow_fetch.
+# Baris dibuat menyerupai output jaydebeapi (DATE/TIMESTAMP sebagai string,
+# DECIMAL sebagai float) dengan cursor.description bertipe JDBC.
+#
+#   python -m benchmarks.bench_arrow_fetch --rows 1000000
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import pyarrow as pa
+
+from arrow_fetch import arrow_types_from_description, pandas_rows_to_table, rows_to_arrow
+
+
+class FakeType:
+    # Pengganti DBAPITypeObject jaydebeapi
+    def __init__(self, *values):
+        self.values = values
+
+
+STRING = FakeType("CHAR", "NCHAR", "NVARCHAR", "VARCHAR", "OTHER")
+NUMBER = FakeType("BOOLEAN", "BIT", "TINYINT", "SMALLINT", "BIGINT", "INTEGER")
+FLOAT = FakeType("REAL", "FLOAT", "DOUBLE")
+DECIMAL = FakeType("DECIMAL", "NUMERIC")
+DATE = FakeType("DATE")
+DATETIME = FakeType("TIMESTAMP")
+
+DESCRIPTION = [
+    ("AC_NO", STRING, None, None, None, None, True),
+    ("AC_BRANCH", STRING, None, None, None, None, True),
+    ("TRN_CODE", STRING, None, None, None, None, True),
+    ("FREQ_TRX", NUMBER, None, None, None, None, True),
+    ("LCY_AMOUNT", DECIMAL, None, None, 18, 2, True),
+    ("RATE", FLOAT, None, None, None, None, True),
+    ("TRN_DT", DATE, None, None, None, None, True),
+    ("CHECKER_DT_STAMP", DATETIME, None, None, None, None, True),
+]
+
+
+def make_batch(start, n):
+    return [
+        (f"{i % 750000:010d}", f"{i % 300:03d}", f"T{i % 97:02d}", i % 1000, (i % 100007) * 0.25,
+         (i % 13) / 7, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+         f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} {i % 24:02d}:{i % 60:02d}:{i % 60:02d}")
+        for i in range(start, start + n)
+    ]
+
+
+def run_child(mode, n_rows, batch_size):
+    batches = [make_batch(start, min(batch_size, n_rows - start)) for start in range(0, n_rows, batch_size)]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    column_types = arrow_types_from_description(DESCRIPTION)
+    names = [desc[0] for desc in DESCRIPTION]
+
+    cpu = time.process_time()
+    tables = []
+    for rows in batches:
+        if mode == "arrow":
+            tables.append(rows_to_arrow(rows, column_types))
+        else:
+            tables.append(pandas_rows_to_table(rows, names))
+    cpu = time.process_time() - cpu
+    table = pa.concat_tables(tables)
+
+    extra_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / 1024
+    print(json.dumps({
+        "mode": mode,
+        "cpu_seconds_per_million_rows": round(cpu * 1e6 / n_rows, 3),
+        "extra_peak_rss_mb": round(extra_mb, 1),
+        "arrow_bytes": table.nbytes,
+        "types": {field.name: str(field.type) for field in table.schema},
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--child", choices=["pandas", "arrow"])
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.rows, args.batch_size)
+        return
+
+    print(f"rows={args.rows} batch_size={args.batch_size}")
+    for mode in ["pandas", "arrow"]:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_arrow_fetch", "--child", mode,
+             "--rows", str(args.rows), "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True,
+        )
+        print(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Benchmark throughput (rows/sec) tahap load ELT: jalur notebook lama vs elt_loader.
+# Sumber: cursor palsu yang menghasilkan baris mirip jaydebeapi (opsional dengan
+# latency per fetch). Target: sink COPY palsu di proses yang sama, atau PostgreSQL
+# lokal jika --pg-dsn diberikan.
+#
+#   python -m benchmarks.bench_elt_load --rows 500000 --fetch-latency 0.2
+#   python -m benchmarks.bench_elt_load --pg-dsn "dbname=bench user=postgres host=localhost"
+import argparse
+import time
+from io import StringIO
+
+import pandas as pd
+
+from elt_loader import MODE_APPEND, MODE_RECREATE, load_query
+from benchmarks.bench_arrow_fetch import DESCRIPTION, make_batch
+
+COLUMNS = [
+    ("ac_no", "VARCHAR(20)"),
+    ("ac_branch", "VARCHAR(10)"),
+    ("trn_code", "VARCHAR(10)"),
+    ("freq_trx", "INTEGER"),
+    ("lcy_amount", "NUMERIC(18,2)"),
+    ("rate", "FLOAT"),
+    ("trn_dt", "DATE"),
+    ("checker_dt_stamp", "TIMESTAMP"),
+]
+
+
+class FakeSourceCursor:
+    def __init__(self, n_rows, latency):
+        self.n_rows = n_rows
+        self.latency = latency
+        self.description = DESCRIPTION
+        self._pos = 0
+
+    def execute(self, query, params=None):
+        self._pos = 0
+
+    def fetchmany(self, size):
+        if self._pos >= self.n_rows:
+            return []
+        time.sleep(self.latency)
+        n = min(size, self.n_rows - self._pos)
+        rows = make_batch(self._pos, n)
+        # Sedikit data kotor seperti di DWH
+        rows[0] = (rows[0][0] + "\x00", "0\n1") + rows[0][2:]
+        self._pos += n
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(self.n_rows)
+
+    def close(self):
+        pass
+
+
+class FakeSource:
+    def __init__(self, n_rows, latency):
+        self.n_rows = n_rows
+        self.latency = latency
+
+    def cursor(self):
+        return FakeSourceCursor(self.n_rows, self.latency)
+
+
+class FakeSinkCursor:
+    # Membaca seluruh isi COPY seperti server PostgreSQL, tanpa menyimpannya
+    def __init__(self, sink):
+        self.sink = sink
+
+    def execute(self, sql, params=None):
+        pass
+
+    def copy_from(self, file, table, sep="\t", null="\\N", columns=None):
+        self.sink.bytes += len(file.read().encode("utf-8"))
+
+    def copy_expert(self, sql, file, size=8192):
+        while True:
+            data = file.read(size)
+            if not data:
+                break
+            self.sink.bytes += len(data)
+
+    def close(self):
+        pass
+
+
+class FakeSink:
+    def __init__(self):
+        self.bytes = 0
+
+    def cursor(self):
+        return FakeSinkCursor(self)
+
+    def commit(self):
+        pass
+
+
+def legacy_load(nz_conn, pg_conn, table, batch_size):
+    # Salinan jalur lama notebook: DataFrame -> applymap x2 -> to_csv(StringIO) -> copy_from
+    nz_cursor = nz_conn.cursor()
+    pg_cursor = pg_conn.cursor()
+    nz_cursor.execute("SELECT ...")
+    total = 0
+    while True:
+        batch = nz_cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        df = pd.DataFrame(batch, columns=[name for name, _ in COLUMNS])
+        df = df.map(lambda x: x.replace("\x00", "") if isinstance(x, str) else x)
+        df = df.map(lambda x: x.replace("\n", " ").replace("\r", " ") if isinstance(x, str) else x)
+        buffer = StringIO()
+        df.to_csv(buffer, index=False, header=False, sep="|", encoding="utf-8", na_rep="", quotechar='"')
+        buffer.seek(0)
+        pg_cursor.copy_from(buffer, table, sep="|", null="", columns=[name for name, _ in COLUMNS])
+        pg_conn.commit()
+        total += len(df)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="detik per fetchmany")
+    parser.add_argument("--pg-dsn", help="pakai PostgreSQL lokal sebagai target")
+    args = parser.parse_args()
+
+    if args.pg_dsn:
+        import psycopg2
+
+        def make_sink():
+            return psycopg2.connect(args.pg_dsn)
+    else:
+        make_sink = FakeSink
+
+    print(f"rows={args.rows} batch_size={args.batch_size} fetch_latency={args.fetch_latency}s "
+          f"sink={'postgresql' if args.pg_dsn else 'fake'}")
+
+    def run(name, fn):
+        sink = make_sink()
+        # Tabel target dibuat ulang supaya tiap mode mulai dari kondisi yang sama
+        load_query(FakeSource(0, 0), sink, "SELECT ...", "bench_elt", COLUMNS, MODE_RECREATE, pipelined=False)
+        start = time.perf_counter()
+        n = fn(FakeSource(args.rows, args.fetch_latency), sink)
+        elapsed = time.perf_counter() - start
+        print(f"{name:22} {n / elapsed:12,.0f} rows/sec  ({elapsed:.2f}s)")
+
+    run("legacy (pandas+copy_from)", lambda src, sink: legacy_load(src, sink, "bench_elt", args.batch_size))
+    run("elt_loader sequential", lambda src, sink: load_query(
+        src, sink, "SELECT ...", "bench_elt", COLUMNS, MODE_APPEND, args.batch_size, pipelined=False))
+    run("elt_loader pipelined", lambda src, sink: load_query(
+        src, sink, "SELECT ...", "bench_elt", COLUMNS, MODE_APPEND, args.batch_size, pipelined=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Benchmark pencarian hyperparameter test_financing_model.ipynb: Pipeline tanpa cache
+# (preprocessing di-fit ulang tiap kandidat x fold) vs financing_model (cache transformer
+# per fold, lalu successive halving). Data sintetis dengan kolom yang sama dengan notebook;
+# preprocessing diberi IterativeImputer supaya biayanya sebanding dengan data asli.
+#
+#   python -m benchmarks.bench_model_search --rows 20000 --n-iter 12 --jobs -1
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from category_encoders import BinaryEncoder, OrdinalEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+from sklearn.impute import IterativeImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import RobustScaler
+
+from financing_model import SEARCH_HALVING, make_pipeline, run_search, search_summary
+
+INCOME = ['< Rp. 3 JUTA', 'Rp. 3 JUTA s.d < 5 JUTA', 'Rp. 5 JUTA s.d < 10 JUTA',
+          'Rp. 10 JUTA s.d < 25 JUTA', 'Rp. 25 JUTA s.d < 50 JUTA', '> Rp. 50 JUTA']
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "JK_WAKTU_TAHUN": rng.integers(1, 20, rows).astype(float),
+        "RATE_CUST": rng.random(rows) * 10,
+        "KOL": rng.choice(list("12345"), rows),
+        "C09_SEGMENTASI_ACCOUNT": rng.choice([f"S{i}" for i in range(12)], rows),
+        "SEKTOR_LOAN": rng.choice([f"L{i}" for i in range(40)], rows),
+        "KATEGORI_NASABAH": rng.choice(list("ABC"), rows),
+        "SEGMENT_GROUP": rng.choice(list("WXYZ"), rows),
+        "MARITAL_STATUS": rng.choice(["K", "B", "J"], rows),
+        "FIXED_INCOME": rng.choice(INCOME, rows),
+    })
+    X.loc[rng.random(rows) < 0.05, "RATE_CUST"] = np.nan
+    income = X.FIXED_INCOME.map({value: i for i, value in enumerate(INCOME)})
+    y = np.log1p(X.JK_WAKTU_TAHUN * 1e7 * (1 + income) + rng.random(rows) * 1e7)
+    return X, y
+
+
+def make_transformer():
+    mapping = [{"col": "FIXED_INCOME", "mapping": {value: i for i, value in enumerate(INCOME)}}]
+    return ColumnTransformer([
+        ("robust", Pipeline([
+            ("impute", IterativeImputer(max_iter=10, random_state=0)),
+            ("scale", RobustScaler()),
+        ]), ["JK_WAKTU_TAHUN", "RATE_CUST"]),
+        ("binary", BinaryEncoder(), [
+            "KOL", "C09_SEGMENTASI_ACCOUNT", "SEKTOR_LOAN", "KATEGORI_NASABAH", "SEGMENT_GROUP", "MARITAL_STATUS",
+        ]),
+        ("pipe_ordinal_scale", Pipeline([
+            ("ordinal", OrdinalEncoder(mapping=mapping)),
+            ("scaler", RobustScaler()),
+        ]), ["FIXED_INCOME"]),
+    ], remainder="passthrough")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--n-iter", type=int, default=12)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    X, y = make_data(args.rows)
+    params = {
+        "model__n_estimators": [10, 20, 40],
+        "model__max_depth": [None, 5, 10],
+        "model__min_samples_leaf": [1, 2, 4],
+    }
+    search_kwargs = {"n_iter": args.n_iter, "cv": args.cv, "n_jobs": args.jobs}
+    model = RandomForestRegressor(random_state=42, n_jobs=1)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        reports = []
+        plain = make_pipeline(make_transformer(), model, RobustScaler(), memory=None)
+        cached = make_pipeline(make_transformer(), model, RobustScaler(), memory=cache_dir)
+        _, plain_report = run_search("tanpa cache", plain, params, X, y, **search_kwargs)
+        reports.append(plain_report)
+        reports.append(run_search("cache (kosong)", cached, params, X, y, **search_kwargs)[1])
+        reports.append(run_search("cache (terisi)", cached, params, X, y, **search_kwargs)[1])
+        reports.append(run_search("halving n_estimators", cached, params, X, y, kind=SEARCH_HALVING,
+                                  resource="model__n_estimators", **search_kwargs)[1])
+        reports.append(run_search("halving n_samples", cached, params, X, y, kind=SEARCH_HALVING,
+                                  **search_kwargs)[1])
+
+    summary = search_summary(reports)
+    print(summary.drop(columns="best_params").to_string(index=False))
+    same = all(r.best_params == plain_report.best_params for r in reports[1:3])
+    print(f"best params random search sama dengan/tanpa cache: {same}")
+
+
+if __name__ == "__main__":
+    main()
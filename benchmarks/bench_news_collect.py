@@ -0,0 +1,127 @@
+# Benchmark pengumpulan berita: alur notebook lama (requests.get per keyword, dateparser
+# per baris) vs news_collector (session + thread pool + rate limit + memo tanggal).
+# SerpAPI diganti server HTTP lokal (stub) dengan latency per request dan sesekali 503,
+# jadi tidak memakai API key / kuota.
+#
+#   python -m benchmarks.bench_news_collect --keywords 20 --pages 3 --latency 0.3
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import dateparser
+import pandas as pd
+import requests
+
+from news_collector import DATE_SETTINGS, PAGE_SIZE, NewsCollector
+
+DATES = ["1 jam lalu", "3 jam lalu", "1 hari lalu", "2 hari lalu", "1 minggu lalu", "15 Jan 2025"]
+
+
+class StubSerpApi(BaseHTTPRequestHandler):
+    # Tiap keyword punya `pages` halaman penuh; sepertiga link sama antar keyword.
+    # Setiap request ke-`fail_every` dijawab 503 (dites oleh retry collector).
+    pages = 3
+    latency = 0.0
+    fail_every = 0
+    counter = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        with self.lock:
+            StubSerpApi.counter += 1
+            n = StubSerpApi.counter
+        time.sleep(self.latency)
+        if self.fail_every and n % self.fail_every == 0:
+            self.send_response(503)
+            self.end_headers()
+            return
+        query = params["q"][0]
+        start = int(params.get("start", ["0"])[0])
+        results = []
+        if start < self.pages * PAGE_SIZE:
+            for i in range(start, start + PAGE_SIZE):
+                key = f"shared-{i}" if i % 3 == 0 else f"{query}-{i}"
+                results.append({
+                    "title": f"Berita {key}",
+                    "source": "stub",
+                    "date": DATES[i % len(DATES)],
+                    "link": f"https://news.example/{key.replace(' ', '-')}",
+                    "snippet": f"Cuplikan {key}",
+                })
+        body = json.dumps({"news_results": results}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_collect(url, keywords, pages):
+    # Alur notebook lama, ditambah halaman supaya jumlah request sama
+    frames = []
+    for kw in keywords:
+        for page in range(pages):
+            params = {"q": kw, "tbm": "nws", "hl": "id", "gl": "id", "api_key": "x"}
+            if page:
+                params["start"] = page * PAGE_SIZE
+            res = requests.get(url, params=params)
+            if res.status_code != 200:
+                continue
+            data = res.json()
+            if "news_results" not in data:
+                continue
+            df = pd.DataFrame([{
+                "title": a["title"], "source": a.get("source"), "date": a.get("date"),
+                "link": a.get("link"), "snippet": a.get("snippet"), "query": kw,
+            } for a in data["news_results"]])
+            frames.append(df)
+    df_all = pd.concat(frames, ignore_index=True)
+    df_all["parsed_date"] = df_all["date"].apply(lambda s: dateparser.parse(s, settings=DATE_SETTINGS))
+    df_all["parsed_date"] = pd.to_datetime(df_all["parsed_date"])
+    return df_all
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=20)
+    parser.add_argument("--fail-every", type=int, default=15)
+    args = parser.parse_args()
+
+    StubSerpApi.pages = args.pages
+    StubSerpApi.latency = args.latency
+    StubSerpApi.fail_every = args.fail_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerpApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/search.json"
+    keywords = [f"keyword {i}" for i in range(args.keywords)]
+
+    try:
+        start = time.perf_counter()
+        legacy = legacy_collect(url, keywords, args.pages)
+        legacy_seconds = time.perf_counter() - start
+
+        collector = NewsCollector("x", base_url=url, workers=args.workers, rate_per_second=args.rate,
+                                  retries=3, backoff=0.05)
+        start = time.perf_counter()
+        df = collector.collect(keywords, pages=args.pages)
+        collector_seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    print(f"legacy    : {len(legacy):6d} baris ({legacy.link.nunique()} link unik) {legacy_seconds:6.2f}s")
+    print(f"collector : {len(df):6d} baris (dedupe link)  {collector_seconds:6.2f}s  gagal={len(collector.failures)}")
+
+
+if __name__ == "__main__":
+    main()
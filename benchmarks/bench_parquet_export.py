@@ -0,0 +1,108 @@
+# Benchmark export Netezza -> Parquet dengan SQLite lokal sebagai pengganti sumber JDBC.
+#
+#   python -m benchmarks.bench_parquet_export --rows 1000000
+#
+# Tiap mode dijalankan di proses terpisah supaya peak RSS (ru_maxrss) tidak saling campur.
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from parquet_export import create_zip_from_exports, stream_query_to_parquet
+
+QUERY = "SELECT * FROM trx"
+
+
+def create_source_db(path, n_rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE trx (id INTEGER, ac_no TEXT, ac_branch TEXT, trn_code TEXT, "
+        "lcy_amount REAL, drcr_ind TEXT, trn_dt TEXT, user_id TEXT, product TEXT)"
+    )
+    chunk = 100000
+    for start in range(0, n_rows, chunk):
+        conn.executemany(
+            "INSERT INTO trx VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (i, f"{i % 750000:010d}", f"{i % 300:03d}", f"T{i % 97:02d}", (i % 10007) * 1.25,
+                 "D" if i % 2 else "C", f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"USER{i % 500}",
+                 f"PRD{i % 40}")
+                for i in range(start, min(start + chunk, n_rows))
+            ),
+        )
+    conn.commit()
+    conn.close()
+
+
+def run_pandas(db_path, batch_size):
+    # Jalur lama streamlit_parquet.py: read_sql -> from_pandas -> BytesIO -> ZIP di memori
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql(QUERY, conn)
+    conn.close()
+    buffer = BytesIO()
+    pq.write_table(pa.Table.from_pandas(df), buffer)
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("trx_1.parquet", buffer.getvalue())
+    return len(df), len(buffer.getvalue())
+
+
+def run_streaming(db_path, batch_size):
+    conn = sqlite3.connect(db_path)
+    export = stream_query_to_parquet(conn, QUERY, batch_size=batch_size)
+    conn.close()
+    zip_file = create_zip_from_exports([export], ["trx_1"])
+    zip_file.close()
+    return export.n_rows, export.n_bytes
+
+
+MODES = {"pandas": run_pandas, "streaming": run_streaming}
+
+
+def run_child(mode, db_path, batch_size):
+    start = time.perf_counter()
+    n_rows, n_bytes = MODES[mode](db_path, batch_size)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "rows": n_rows, "parquet_bytes": n_bytes,
+                      "seconds": round(elapsed, 3), "peak_rss_mb": round(peak_mb, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--child", choices=sorted(MODES))
+    parser.add_argument("--db")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.db, args.batch_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "source.db")
+        create_source_db(db_path, args.rows)
+        print(f"rows={args.rows} batch_size={args.batch_size}")
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_parquet_export", "--child", mode,
+                 "--db", db_path, "--batch-size", str(args.batch_size)],
+                check=True, capture_output=True, text=True,
+            )
+            print(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
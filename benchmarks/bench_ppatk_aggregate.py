@@ -0,0 +1,105 @@
+# Benchmark agregasi PPATK out-of-core: pandas in-memory (alur notebook: concat, dropna,
+# groupby / value_counts) vs ppatk_aggregate dengan 1..N worker, untuk file CSV dan
+# Parquet (satu task per row group). Hasil sum/count dicek sama persis dengan pandas
+# (total dalam sen),
+# distinct count (HyperLogLog) dilaporkan error relatifnya.
+#
+#   python -m benchmarks.bench_ppatk_aggregate --files 6 --rows 300000 --workers 1 2 4
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ppatk_aggregate import AggregationSpec, aggregate_files
+
+
+def make_month(seed, n_rows, n_accounts=50_000):
+    rng = np.random.default_rng(seed)
+    account = rng.integers(0, n_accounts, n_rows)
+    provinces = np.array([f"PROVINSI {i}" for i in range(34)], dtype=object)
+    return pd.DataFrame({
+        "NO_REFERENSI": [f"{seed:02d}{i:012d}" for i in range(n_rows)],
+        "NO_REKENING": 8_000_000_000 + account,
+        "NAMA_REKENING": np.array([f"NASABAH {a}" for a in range(n_accounts)], dtype=object)[account],
+        "NOMINAL": rng.integers(100, 5_000_000_000, n_rows) / 100,
+        "PROPINSI": provinces[account % len(provinces)],
+        "JENIS_KELAMIN": np.where(account % 2 == 0, "LAKI-LAKI", "PEREMPUAN"),
+        "CUSTOMERID": 1_000_000 + account,
+        "BANK_LAWAN": np.where(rng.random(n_rows) < 0.04, None, "BANK X"),
+    })
+
+
+def pandas_reference(paths):
+    # Total referensi dijumlah pandas dalam sen (int64) -> exact. groupby().sum() float biasa
+    # bisa selisih 1 ULP dari jumlah desimal yang sebenarnya (dilaporkan terpisah).
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True).dropna()
+    cents = (df["NOMINAL"] * 100).round().astype("int64")
+    return {
+        "NAMA_REKENING": cents.groupby(df["NAMA_REKENING"]).sum() / 100,
+        "PROPINSI": cents.groupby(df["PROPINSI"]).sum() / 100,
+        "float_NAMA_REKENING": df.groupby("NAMA_REKENING")["NOMINAL"].sum(),
+        "count_PROPINSI": df["PROPINSI"].value_counts(),
+        "count_JENIS_KELAMIN": df["JENIS_KELAMIN"].value_counts(),
+        "distinct_NO_REKENING": df["NO_REKENING"].nunique(),
+        "rows": len(df),
+    }
+
+
+def check(result, reference):
+    for column in ("NAMA_REKENING", "PROPINSI"):
+        totals = result.totals(column).set_index(column)["NOMINAL"].sort_index()
+        expected = reference[column].sort_index()
+        assert totals.index.equals(expected.index.astype(object)), column
+        assert (totals.to_numpy() == expected.to_numpy()).all(), column
+    for column in ("PROPINSI", "JENIS_KELAMIN"):
+        counts = result.value_counts(column).set_index(column)["jumlah"].sort_index()
+        assert (counts.to_numpy() == reference[f"count_{column}"].sort_index().to_numpy()).all(), column
+    assert result.rows == reference["rows"]
+    totals = result.totals("NAMA_REKENING").set_index("NAMA_REKENING")["NOMINAL"].sort_index().to_numpy()
+    float_sums = reference["float_NAMA_REKENING"].sort_index().to_numpy()
+    ulps = np.abs(totals - float_sums) / np.spacing(np.abs(float_sums))
+    estimate = result.distinct_count("NO_REKENING")
+    exact = reference["distinct_NO_REKENING"]
+    return abs(estimate - exact) / exact, int((ulps > 0).sum()), float(ulps.max())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--row-group", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_paths, parquet_paths = [], []
+        for i in range(args.files):
+            df = make_month(i, args.rows)
+            csv_paths.append(os.path.join(tmp, f"transaksi_ppatk_{i:02d}.csv"))
+            parquet_paths.append(os.path.join(tmp, f"transaksi_ppatk_{i:02d}.parquet"))
+            df.to_csv(csv_paths[-1], index=False)
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), parquet_paths[-1],
+                           row_group_size=args.row_group)
+
+        start = time.perf_counter()
+        reference = pandas_reference(csv_paths)
+        print(f"pandas in-memory   : {time.perf_counter() - start:6.2f}s ({reference['rows']} baris)")
+
+        spec = AggregationSpec(distinct=("NO_REKENING",))
+        for label, paths in (("csv", csv_paths), ("parquet", parquet_paths)):
+            for workers in args.workers:
+                start = time.perf_counter()
+                result = aggregate_files(paths, spec, workers=workers)
+                seconds = time.perf_counter() - start
+                error, n_ulp, max_ulp = check(result, reference)
+                print(f"{label:8s} workers={workers:<2d}: {seconds:6.2f}s  sum/count exact, "
+                      f"distinct error {error:.2%}, vs float groupby: {n_ulp} akun beda maks {max_ulp:.0f} ULP")
+
+
+if __name__ == "__main__":
+    main()
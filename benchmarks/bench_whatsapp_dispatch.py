@@ -0,0 +1,72 @@
+# Benchmark antrian WhatsApp dengan backend palsu (tanpa browser): throughput sekuensial
+# (setara loop iterrows lama) vs worker paralel, lalu simulasi proses mati di tengah
+# jalan dan dilanjutkan dari checkpoint SQLite tanpa kirim ganda.
+#
+#   python -m benchmarks.bench_whatsapp_dispatch --contacts 2000 --latency 0.02
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from whatsapp_dispatch import Checkpoint, Dispatcher, FakeSender, build_messages, campaign_id
+
+TEMPLATE = "Hello {Name}, this message is sent to you just for test."
+
+
+class CrashingSender(FakeSender):
+    # Berhenti (seperti proses mati) setelah `crash_after` pesan
+    def __init__(self, crash_after, **kwargs):
+        super().__init__(**kwargs)
+        self.crash_after = crash_after
+
+    def send(self, phone, message):
+        if sum(self.sent.values()) >= self.crash_after:
+            raise KeyboardInterrupt
+        super().send(phone, message)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    df = pd.DataFrame({
+        "Name": [f"Nasabah {i}" for i in range(args.contacts)],
+        "Phone": [6281200000000 + i for i in range(args.contacts)],
+    })
+    messages = build_messages(df, TEMPLATE)
+    campaign = campaign_id(TEMPLATE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, concurrency in (("sekuensial", 1), (f"{args.concurrency} worker", args.concurrency)):
+            sender = FakeSender(latency=args.latency, failure_rate=args.failure_rate)
+            checkpoint = Checkpoint(os.path.join(tmp, f"{concurrency}.sqlite"))
+            stats = Dispatcher(sender, checkpoint, concurrency=concurrency, backoff=0.01).run(messages, campaign)
+            checkpoint.close()
+            print(f"{label:12s}: {stats.as_dict()}")
+
+        path = os.path.join(tmp, "resume.sqlite")
+        crashing = CrashingSender(args.contacts // 2, latency=args.latency)
+        checkpoint = Checkpoint(path)
+        try:
+            Dispatcher(crashing, checkpoint, concurrency=1).run(messages, campaign)
+        except KeyboardInterrupt:
+            pass
+        checkpoint.close()
+
+        sender = FakeSender(latency=args.latency)
+        checkpoint = Checkpoint(path)
+        stats = Dispatcher(sender, checkpoint, concurrency=args.concurrency).run(messages, campaign)
+        duplicates = set(crashing.sent) & set(sender.sent)
+        print(f"resume      : {stats.as_dict()}")
+        print(f"terkirim sebelum crash={len(crashing.sent)}, setelah resume={len(sender.sent)}, "
+              f"kirim ganda={len(duplicates)}, checkpoint={checkpoint.summary(campaign)}")
+        checkpoint.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Loader dataset besar untuk notebook analisa (tes_ppatk.ipynb, test_financing_model.ipynb):
+# sumber CSV/Excel dikonversi sekali ke Parquet dengan schema ringkas (kategori untuk kolom
+# teks berulang, integer di-downcast; float tetap float64 supaya sum/groupby di notebook tidak
+# berubah presisi), lalu load berikutnya membaca Parquet saja.
+# CSV dibaca per chunk (dua putaran: statistik kolom, lalu tulis), jadi file yang lebih
+# besar dari RAM tetap bisa dikonversi.
+
+CACHE_DIR = ".dataset_cache"
+
+# Naikkan jika format schema / cache berubah supaya cache lama dibuat ulang
+SCHEMA_VERSION = 3
+
+CHUNK_ROWS = 200_000
+
+# Kolom teks dengan nilai unik <= rasio ini dari jumlah baris disimpan sebagai kategori
+CATEGORY_RATIO = 0.5
+
+# Batas nilai unik yang dilacak per kolom teks saat inferensi (hemat memori)
+CATEGORY_MAX_UNIQUE = 100_000
+
+PPATK_CATEGORICAL = ("PROPINSI", "JENIS_KELAMIN", "NAMA_REKENING")
+
+PROFILE_COLUMNS = ["dataFeatures", "dataType", "null", "nullPct", "unique", "uniqueSample"]
+
+_INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+class _ColumnStats:
+    # Statistik satu kolom, digabung antar chunk
+    def __init__(self):
+        self.kinds = set()
+        self.min = None
+        self.max = None
+        self.uniques = set()
+        self.too_many = False
+
+    def update(self, series):
+        kind = series.dtype.kind
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            kind = "O"
+        self.kinds.add(kind)
+        values = series.dropna()
+        if kind in "iuf" and len(values):
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        elif kind == "O" and not self.too_many:
+            self.uniques.update(values.unique().tolist())
+            if len(self.uniques) > CATEGORY_MAX_UNIQUE:
+                self.too_many = True
+                self.uniques = set()
+
+    def dtype(self, n_rows, force_category, category_ratio):
+        kinds = self.kinds
+        if kinds <= {"b"}:
+            return "bool"
+        if kinds <= {"M"}:
+            return "datetime64[ns]"
+        if kinds <= {"i", "u"}:
+            for int_type in _INT_TYPES:
+                info = np.iinfo(int_type)
+                if self.min is None or (info.min <= self.min and self.max <= info.max):
+                    return np.dtype(int_type).name
+        if kinds <= {"i", "u", "f"}:
+            # Tidak di-downcast ke float32: walau tiap nilai pas, agregasi (sum per grup) di
+            # float32 kehilangan presisi untuk nominal rupiah
+            return "float64"
+        if force_category or (
+            category_ratio and not self.too_many and len(self.uniques) <= max(1, category_ratio * n_rows)
+        ):
+            return "category"
+        return "string"
+
+
+def _is_excel(path):
+    return os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm", ".xls")
+
+
+def _read_dtypes(schema):
+    # dtype untuk read_csv putaran kedua, supaya semua chunk konsisten dengan schema
+    dtypes = {}
+    for column, dtype in schema.items():
+        if dtype in ("string", "category"):
+            dtypes[column] = str
+        elif dtype.startswith("float"):
+            dtypes[column] = "float64"
+    return dtypes
+
+
+def _arrow_schema(schema):
+    fields = []
+    for column, dtype in schema.items():
+        if dtype == "category":
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif dtype == "string":
+            arrow_type = pa.string()
+        elif dtype == "datetime64[ns]":
+            arrow_type = pa.timestamp("ns")
+        else:
+            arrow_type = pa.from_numpy_dtype(np.dtype(dtype))
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def apply_schema(df, schema):
+    # DataFrame -> dtype ringkas sesuai schema {kolom: dtype}
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == "string":
+            converted[column] = df[column].astype("string")
+        elif dtype == "category":
+            # Kategori selalu bertipe teks (Excel bisa mencampur angka dan teks di satu kolom)
+            converted[column] = df[column].astype("string").astype("category")
+        else:
+            converted[column] = df[column].astype(dtype)
+    return df.assign(**converted)
+
+
+def _source_chunks(path, chunk_rows, read_kwargs):
+    # Fungsi yang menghasilkan iterator chunk; Excel dibaca sekali dan dipakai di kedua putaran
+    if _is_excel(path):
+        frame = pd.read_excel(path, **read_kwargs)
+        return lambda dtype=None: iter([frame])
+    return lambda dtype=None: pd.read_csv(path, chunksize=chunk_rows, dtype=dtype, **read_kwargs)
+
+
+def infer_schema(chunks, categorical=(), category_ratio=CATEGORY_RATIO):
+    # {kolom: dtype} dari iterator chunk DataFrame (satu putaran). Kolom di `categorical`
+    # selalu kategori; category_ratio=0 -> kolom lain tidak pernah otomatis jadi kategori.
+    stats = {}
+    n_rows = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        for column in chunk.columns:
+            stats.setdefault(column, _ColumnStats()).update(chunk[column])
+    return {
+        column: column_stats.dtype(n_rows, column in categorical, category_ratio)
+        for column, column_stats in stats.items()
+    }
+
+
+def convert_to_parquet(path, out_path, categorical=(), category_ratio=CATEGORY_RATIO, chunk_rows=CHUNK_ROWS,
+                       **read_kwargs):
+    # Konversi sumber -> Parquet dengan schema hasil inferensi; return schema
+    chunks = _source_chunks(path, chunk_rows, read_kwargs)
+    schema = infer_schema(chunks(), categorical, category_ratio)
+    arrow_schema = _arrow_schema(schema)
+    read_dtypes = _read_dtypes(schema) if not _is_excel(path) else None
+
+    out_dir = os.path.dirname(out_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pq.ParquetWriter(tmp_path, arrow_schema) as writer:
+            for chunk in chunks(read_dtypes):
+                table = pa.Table.from_pandas(apply_schema(chunk, schema), schema=arrow_schema, preserve_index=False)
+                writer.write_table(table)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return schema
+
+
+def _cache_paths(path, cache_dir):
+    base = os.path.join(cache_dir, os.path.basename(path))
+    return base + ".parquet", base + ".schema.json"
+
+
+def _read_schema_file(schema_path):
+    try:
+        with open(schema_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cached_parquet(path, categorical=(), category_ratio=CATEGORY_RATIO, cache_dir=CACHE_DIR, chunk_rows=CHUNK_ROWS,
+                   **read_kwargs):
+    # Path Parquet + schema untuk sumber `path`. Konversi hanya jika sumber berubah
+    # (mtime/size) atau opsi kategori berbeda dari cache.
+    stat = os.stat(path)
+    parquet_path, schema_path = _cache_paths(path, cache_dir)
+    source = {
+        "version": SCHEMA_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "categorical": sorted(categorical),
+        "category_ratio": category_ratio,
+        "read_kwargs": {key: repr(value) for key, value in sorted(read_kwargs.items())},
+    }
+    meta = _read_schema_file(schema_path)
+    if meta is not None and meta.get("source") == source and os.path.exists(parquet_path):
+        return parquet_path, meta["columns"]
+
+    schema = convert_to_parquet(path, parquet_path, categorical, category_ratio, chunk_rows, **read_kwargs)
+    with open(schema_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "columns": schema}, f, indent=1)
+    return parquet_path, schema
+
+
+def load_dataset(path, categorical=(), category_ratio=CATEGORY_RATIO, columns=None, cache_dir=CACHE_DIR,
+                 chunk_rows=CHUNK_ROWS, **read_kwargs):
+    # DataFrame dengan dtype ringkas; kolom kategori dibaca langsung sebagai dictionary
+    # (tidak lewat string penuh di memori)
+    parquet_path, schema = cached_parquet(path, categorical, category_ratio, cache_dir, chunk_rows, **read_kwargs)
+    wanted = columns or list(schema)
+    table = pq.read_table(
+        parquet_path,
+        columns=columns,
+        read_dictionary=[column for column in wanted if schema.get(column) == "category"],
+    )
+    return table.to_pandas()
+
+
+def iter_dataset(path, categorical=(), category_ratio=CATEGORY_RATIO, columns=None, batch_rows=CHUNK_ROWS,
+                 cache_dir=CACHE_DIR, **read_kwargs):
+    # Yield DataFrame per batch dari cache Parquet, untuk dataset yang tidak muat di RAM
+    parquet_path, schema = cached_parquet(path, categorical, category_ratio, cache_dir, **read_kwargs)
+    parquet_file = pq.ParquetFile(
+        parquet_path,
+        read_dictionary=[column for column, dtype in schema.items() if dtype == "category"],
+    )
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def clean_rows(df, dropna=True, drop_duplicates=True):
+    # dropna + drop_duplicates dengan satu mask dan satu copy. Baris identik punya pola
+    # null yang sama, jadi duplicated() sebelum dropna = duplicated() setelah dropna.
+    keep = np.ones(len(df), dtype=bool)
+    if dropna:
+        keep &= df.notna().all(axis=1).to_numpy()
+    if drop_duplicates:
+        keep &= ~df.duplicated().to_numpy()
+    return df[keep]
+
+
+def profile_frame(df, samples=1, random_state=None, null_pct=True):
+    # Tabel deskripsi kolom (dataFeatures, dataType, null, nullPct, unique, uniqueSample).
+    # Null dihitung sekali untuk seluruh frame; unique + sample diambil dari satu factorize
+    # per kolom (tanpa nunique + drop_duplicates + sample terpisah).
+    rng = np.random.default_rng(random_state)
+    nulls = df.isna().sum()
+    unique_counts = []
+    unique_samples = []
+    for column in df.columns:
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+        unique_counts.append(len(uniques))
+        n = min(samples, len(uniques))
+        picks = rng.choice(len(uniques), size=n, replace=False) if n else []
+        unique_samples.append([uniques[i] for i in picks])
+    profile = pd.DataFrame({
+        "dataFeatures": df.columns,
+        "dataType": df.dtypes.to_numpy(),
+        "null": nulls.to_numpy(),
+        "nullPct": (nulls.to_numpy() / max(len(df), 1) * 100).round(2),
+        "unique": unique_counts,
+        "uniqueSample": unique_samples,
+    })
+    if not null_pct:
+        profile = profile.drop(columns="nullPct")
+    return profile[[column for column in PROFILE_COLUMNS if column in profile.columns]]
@@ -0,0 +1,78 @@
+import threading
+from contextlib import contextmanager
+
+# Utilitas database bersama untuk app Streamlit:
+# - ConnectionPool: streamlit_parquet (parquet_export), Report_Search_MCRS
+#   (mcrs_search.PostgresEngine) dan xmeta_stream2
+# - like_pattern: pola LIKE/ILIKE substring literal untuk mcrs_search dan xmeta_search
+
+# Jumlah maksimum koneksi yang dibuka bersamaan
+DEFAULT_POOL_SIZE = 4
+
+
+class ConnectionPool:
+    # Pool koneksi terbatas yang bisa dipakai ulang antar query dan antar rerun.
+    # connect: fungsi tanpa argumen yang membuka koneksi baru (mis. connect_to_netezza).
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE):
+        self._connect = connect
+        self.size = size
+        self._idle = []
+        self._created = 0
+        self._available = threading.Condition()
+
+    def _acquire(self):
+        # Ambil koneksi idle (LIFO), buat baru jika slot masih ada, atau tunggu sampai
+        # ada koneksi yang dikembalikan / slot yang dibebaskan _discard
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._connect()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _discard(self, conn):
+        self._release_slot()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _return(self, conn):
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Error, atau generator pemakai ditutup di tengah (GeneratorExit / KeyboardInterrupt):
+            # status koneksi tidak pasti, jadi dibuang dan slot-nya dibebaskan
+            self._discard(conn)
+            raise
+        else:
+            self._return(conn)
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+
+def like_pattern(text):
+    # Substring literal: %, _ dan \ dari input user tidak dianggap wildcard
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
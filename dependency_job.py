@@ -2,22 +2,33 @@ import pandas as pd
 import networkx as nx
 import streamlit as st
 from streamlit_tree_select import tree_select
-from pyvis.network import Network
 import streamlit.components.v1 as components
 import json
-import sys
 import os 
-from fuzzywuzzy import process 
-
-# Meningkatkan batas kedalaman rekursi untuk Graph yang besar
-sys.setrecursionlimit(3000) 
+from job_graph_index import iter_cycles, load_job_graph_index
+from job_graph_render import LOD_NODE_LIMIT, VIEW_ANCESTORS, VIEW_DESCENDANTS, render_graph_html
+from job_lineage import load_lineage
+from job_search import JobSearchIndex
+from job_tree import build_lazy_tree, tree_value_to_job, tree_values_to_jobs
 
 # Set konfigurasi halaman
 st.set_page_config(layout="wide", page_title="Job Hierarchy Viewer - MIS PROPERTY")
 
 # --- 1. Load data ---
+JOB_FILE = "job_hirarki.xlsx"
+
+# Index graph di-cache per proses (key: mtime workbook) dan di disk (.job_graph_cache),
+# jadi rerun Streamlit tidak membaca ulang Excel selama workbook tidak berubah.
+@st.cache_resource(show_spinner="Memuat index graph job...")
+def load_graph_index(path, mtime_ns):
+    index = load_job_graph_index(path)
+    if not index.has_cycle:
+        # Transitive closure dihitung sekali di sini; tree, graph dan download membaca darinya
+        index.build_reachability()
+    return index
+
 try:
-    df = pd.read_excel("job_hirarki.xlsx") 
+    graph_index = load_graph_index(JOB_FILE, os.stat(JOB_FILE).st_mtime_ns)
 except FileNotFoundError:
     st.error("❌ Error: File 'job_hirarki.xlsx' tidak ditemukan. Pastikan file ada di direktori yang sama.")
     st.stop()
@@ -30,59 +41,59 @@ except Exception as e:
 # === 2. Graph creation and Utility Functions ===
 # ====================================================================
 
-df['JOB Name'] = df['JOB Name'].astype(str).str.strip()
-df['Sequence'] = df['Sequence'].fillna('').astype(str).str.strip()
+G = graph_index.to_networkx()
 
-G = nx.DiGraph()
-valid_jobs = set()
+all_job_names = graph_index.sorted_names
 
-for job_name in df['JOB Name'].unique():
-    if job_name and job_name.lower() not in ["nan", "not available", ""]:
-        G.add_node(job_name)
-        valid_jobs.add(job_name)
-        
-for _, row in df.iterrows():
-    job = row['JOB Name']
-    seq = row['Sequence']
-    
-    if job in valid_jobs and seq in valid_jobs:
-        if job != seq: 
-            G.add_edge(seq, job)
+# Index fuzzy search dibangun sekali per versi workbook (trigram + prefix shortlist)
+@st.cache_resource(show_spinner=False)
+def load_search_index(mtime_ns, _job_names):
+    return JobSearchIndex(_job_names)
 
-all_job_names = sorted(list(set(G.nodes)))
+search_index = load_search_index(os.stat(JOB_FILE).st_mtime_ns, all_job_names)
 
-try:
-    cycles = list(nx.simple_cycles(G))
-except nx.NetworkXError as e:
-    st.error(f"❌ Error: Struktur data graph bermasalah setelah pembersihan. Detail: {e}")
-    st.stop()
+# Mapping report -> job (opsional): lineage gabungan di-cache per versi kedua workbook,
+# jadi dampak report untuk job terpilih tidak membaca ulang Excel. Graph job-nya dibangun
+# dari graph_index yang sama (bukan parse ulang job_hirarki.xlsx).
+REPORT_MAPPING_FILE = os.environ.get("REPORT_MAPPING_FILE", "report_to_job_mapping.xlsx")
 
-if cycles:
+@st.cache_resource(show_spinner="Memuat lineage report...")
+def load_report_lineage(job_path, mapping_path, job_mtime_ns, mapping_mtime_ns, _index):
+    return load_lineage(job_path, mapping_path, index=_index)
+
+report_lineage = None
+if os.path.exists(REPORT_MAPPING_FILE):
+    try:
+        report_lineage = load_report_lineage(
+            JOB_FILE, REPORT_MAPPING_FILE,
+            os.stat(JOB_FILE).st_mtime_ns, os.stat(REPORT_MAPPING_FILE).st_mtime_ns, graph_index
+        )
+    except Exception as e:
+        st.warning(f"⚠️ Lineage report tidak dimuat dari '{REPORT_MAPPING_FILE}': {e}")
+
+# Cek cycle sudah dihitung saat index dibangun (Kahn, linear); contoh loop diambil
+# lazy maksimal 5, satu per strongly connected component.
+if graph_index.has_cycle:
     st.error("🚨 KRITIS: TERDETEKSI CIRCULAR DEPENDENCY!")
     st.markdown("Visualisasi **masih gagal** karena adanya **loop** dalam data Anda. Mohon perbaiki data.")
-    for i, cycle in enumerate(cycles[:5]): 
-        st.code(f"Loop {i+1}: {' -> '.join(cycle)} -> {cycle[0]}", language='python')
+    for i, cycle in enumerate(iter_cycles(graph_index, limit=5)): 
+        jobs = cycle['jobs']
+        st.code(f"Loop {i+1}: {' -> '.join(jobs)} -> {jobs[0]}", language='python')
+        st.caption(f"Baris workbook pembentuk loop (komponen berisi {cycle['component_size']} job):")
+        st.dataframe(pd.DataFrame(cycle['rows'], columns=["Baris Excel", "JOB Name", "Sequence"]), hide_index=True)
     st.stop() 
 
 
-# --- Graph Functions (Caching) ---
-@st.cache_data
-def get_descendant_count(_G, root):
-    return len(nx.descendants(_G, root)) + 1 
+# --- Graph Functions (Reachability Index) ---
+def get_descendant_count(index, root):
+    return index.descendant_count(root) + 1 
 
-def build_tree(G, root):
-    count = get_descendant_count(G, root) 
-    label = f"{root} ({count})"
-    children = list(G.successors(root))
-    
-    if not children:
-        return {"label": label, "value": root}
-        
-    return {
-        "label": label,
-        "value": root,
-        "children": [build_tree(G, c) for c in children]
-    }
+def build_tree(index, root, expanded):
+    # Lazy: hanya level yang sedang dibuka yang dibangun (lihat job_tree.py)
+    return build_lazy_tree(
+        index, root, expanded,
+        label_fn=lambda job, n_children: f"{job} ({get_descendant_count(index, job)})"
+    )
 
 def get_expansion_path(G, target_job):
     all_roots = [node for node in G.nodes if not list(G.predecessors(node))]
@@ -97,15 +108,19 @@ def get_expansion_path(G, target_job):
     except:
          return [target_job]
 
-def get_full_subgraph(G, root):
-    descendants = nx.descendants(G, root)
-    sub_nodes = [root] + list(descendants)
-    return G.subgraph(sub_nodes)
+def get_full_subgraph(index, root):
+    return index.descendant_subgraph(root)
+
+def get_full_predecessor_subgraph(index, root):
+    return index.ancestor_subgraph(root)
+
+# Batas node sebelum graph dirender dengan level-of-detail (bisa diatur via env)
+GRAPH_LOD_NODE_LIMIT = int(os.environ.get("JOB_GRAPH_LOD_NODE_LIMIT", LOD_NODE_LIMIT))
 
-def get_full_predecessor_subgraph(G, root):
-    predecessors = nx.ancestors(G, root)
-    sub_nodes = list(predecessors) + [root]
-    return G.subgraph(sub_nodes)
+# HTML pyvis di-cache per (root, mode tampilan) dan versi workbook; tanpa file sementara
+@st.cache_data(show_spinner="Menyiapkan graph...", max_entries=128)
+def get_graph_html(_index, mtime_ns, root, view, lod_limit):
+    return render_graph_html(_index, root, view, lod_limit)
 
 
 # -----------------
@@ -129,8 +144,8 @@ with col_tree:
 
     if search_job_input:
         search_job = search_job_input.strip()
-        matches = process.extract(search_job, all_job_names, limit=10)
-        good_matches = [match[0] for match in matches if match[1] >= 70]
+        matches = search_index.search(search_job, limit=10, threshold=70)
+        good_matches = [match[0] for match in matches]
 
         if good_matches:
             st.success(f"Ditemukan {len(good_matches)} Job yang mirip. Klik tombol:")
@@ -152,16 +167,23 @@ with col_tree:
         st.subheader("2. Hasil Hierarki (Tree Folding)")
         st.caption(f"Job Terpilih: **{primary_root_job}**")
         
+        # Default (hanya root terbuka) diset sekali per root; setelah itu state hanya diubah
+        # oleh auto-expand atau oleh user, jadi root yang ditutup user tetap tertutup
+        if st.session_state.get('expanded_root') != primary_root_job:
+            st.session_state['expanded_root'] = primary_root_job
+            st.session_state['expanded_nodes'] = [primary_root_job]
+            st.session_state['desc_expanded_nodes'] = []
+
         job_for_auto_expand = st.session_state.get('job_to_expand')
         if job_for_auto_expand and job_for_auto_expand == primary_root_job:
             expanded_paths = get_expansion_path(G, primary_root_job)
             st.session_state['expanded_nodes'] = expanded_paths
             st.session_state['job_to_expand'] = None 
         
-        expanded_nodes = st.session_state.get('expanded_nodes', [primary_root_job])
+        expanded_nodes = st.session_state['expanded_nodes']
         
         try:
-            tree_data = [build_tree(G, primary_root_job)]
+            tree_data = [build_tree(graph_index, primary_root_job, expanded_nodes)]
             selected = tree_select(
                 tree_data, 
                 expand_on_click=True, 
@@ -169,8 +191,18 @@ with col_tree:
                 expanded=expanded_nodes
             )
             
-            if 'value' in selected and selected['value']:
-                selected_tree_node = selected['value'][0] 
+            # Folder yang baru dibuka user: bangun anak-anaknya di rerun berikutnya
+            # Hanya dibandingkan jika komponen sudah melaporkan daftar expanded
+            if selected and selected.get('expanded') is not None:
+                opened_nodes = tree_values_to_jobs(selected['expanded'])
+            else:
+                opened_nodes = expanded_nodes
+            if set(opened_nodes) != set(expanded_nodes):
+                st.session_state['expanded_nodes'] = opened_nodes
+                st.rerun()
+            
+            if selected and selected.get('value'):
+                selected_tree_node = tree_value_to_job(selected['value'][0]) 
                 st.caption(f"Node Graph Root saat ini: `{selected_tree_node}`")
                 st.session_state['graph_control_node'] = selected_tree_node
             else:
@@ -186,8 +218,6 @@ st.markdown("---")
 st.subheader("📁 Turunan Job (Expandable Folder Style)")
 
 if primary_root_job:
-    subG = get_full_subgraph(G, primary_root_job)
-
     if "expand_all_desc" not in st.session_state:
         st.session_state.expand_all_desc = False
 
@@ -198,9 +228,10 @@ if primary_root_job:
     with col2:
         if st.button("🔼 Collapse All Turunan"):
             st.session_state.expand_all_desc = False
+            st.session_state.desc_expanded_nodes = []
     with col3:
         # === Tombol download full hierarchy ===
-        all_edges = list(nx.edge_dfs(G, source=primary_root_job))
+        all_edges = graph_index.descendant_edges(primary_root_job)
         if all_edges:
             df_full = pd.DataFrame(all_edges, columns=["Parent", "Child"])
             df_full.insert(0, "Root", primary_root_job)
@@ -214,26 +245,22 @@ if primary_root_job:
             )
 
     # === Build struktur pohon ===
-    def build_desc_tree(G, root):
-        children = sorted(list(G.successors(root)))
-        if not children:
-            return {"label": f"📄 {root}", "value": root}
-        else:
-            return {
-                "label": f"📁 {root} ({len(children)})",
-                "value": root,
-                "children": [build_desc_tree(G, c) for c in children]
-            }
+    def build_desc_tree(index, root, expanded):
+        return build_lazy_tree(
+            index, root, expanded,
+            label_fn=lambda job, n_children: f"📁 {job} ({n_children})" if n_children else f"📄 {job}",
+            sort_children=True
+        )
 
     try:
-        desc_tree_data = [build_desc_tree(G, primary_root_job)]
-        st.caption(f"Klik folder untuk buka/tutup turunan dari **{primary_root_job}**")
-
         # === Atur node yang diexpand ===
         if st.session_state.expand_all_desc:
-            all_expanded_nodes = list(nx.descendants(G, primary_root_job)) + [primary_root_job]
+            all_expanded_nodes = graph_index.descendants(primary_root_job) + [primary_root_job]
         else:
-            all_expanded_nodes = []
+            all_expanded_nodes = st.session_state.get("desc_expanded_nodes", [])
+
+        desc_tree_data = [build_desc_tree(graph_index, primary_root_job, all_expanded_nodes)]
+        st.caption(f"Klik folder untuk buka/tutup turunan dari **{primary_root_job}**")
 
         selected_desc = tree_select(
             desc_tree_data,
@@ -244,18 +271,26 @@ if primary_root_job:
             expanded=all_expanded_nodes,
         )
 
+        # Lazy load: folder yang baru dibuka dimuat anak-anaknya di rerun berikutnya
+        if (selected_desc and selected_desc.get("expanded") is not None
+                and not st.session_state.expand_all_desc):
+            opened_desc = tree_values_to_jobs(selected_desc["expanded"])
+            if set(opened_desc) != set(all_expanded_nodes):
+                st.session_state.desc_expanded_nodes = opened_desc
+                st.rerun()
+
         selected_last_node = None
         if selected_desc:
             if "checked" in selected_desc and selected_desc["checked"]:
-                selected_last_node = selected_desc["checked"][-1]
+                selected_last_node = tree_value_to_job(selected_desc["checked"][-1])
             elif "value" in selected_desc and selected_desc["value"]:
-                selected_last_node = selected_desc["value"][-1]
+                selected_last_node = tree_value_to_job(selected_desc["value"][-1])
 
         # === Jika user klik node tertentu ===
         if selected_last_node:
             st.success(f"📂 Node terakhir dibuka/dipilih: `{selected_last_node}`")
 
-            descendants_last = sorted(list(nx.descendants(G, selected_last_node)))
+            descendants_last = sorted(graph_index.descendants(selected_last_node))
             df_last_desc = pd.DataFrame({
                 "Root Job": selected_last_node,
                 "Descendant Job": descendants_last
@@ -276,7 +311,7 @@ if primary_root_job:
 
         # === Kalau belum klik node tapi Expand All aktif ===
         elif st.session_state.expand_all_desc:
-            descendants_root = sorted(list(nx.descendants(G, primary_root_job)))
+            descendants_root = sorted(graph_index.descendants(primary_root_job))
             df_root_desc = pd.DataFrame({
                 "Root Job": primary_root_job,
                 "Descendant Job": descendants_root
@@ -300,6 +335,29 @@ if primary_root_job:
     except Exception as e:
         st.error(f"❌ Error saat menampilkan turunan job: {e}")
 
+    # --- Report yang terdampak oleh job terpilih (job ini + semua turunannya) ---
+    if report_lineage is not None:
+        st.markdown("---")
+        st.subheader("📑 Report Terdampak")
+        if primary_root_job in report_lineage:
+            df_impact = report_lineage.report_links(primary_root_job)
+        else:
+            df_impact = pd.DataFrame(columns=["report_name", "job_name"])
+        if df_impact.empty:
+            st.info(f"Tidak ada report di mapping yang bergantung pada **{primary_root_job}**.")
+        else:
+            st.caption(
+                f"{df_impact['report_name'].nunique()} report bergantung pada `{primary_root_job}` "
+                f"lewat {df_impact['job_name'].nunique()} job."
+            )
+            st.dataframe(df_impact, hide_index=True, use_container_width=True)
+            st.download_button(
+                label=f"⬇️ Download Report Terdampak `{primary_root_job}` (CSV)",
+                data=df_impact.to_csv(index=False).encode("utf-8"),
+                file_name=f"report_impact_{primary_root_job.replace(' ', '_')}.csv",
+                mime="text/csv"
+            )
+
     st.markdown("---")
 
     # --- Daftar Semua Job ---
@@ -342,52 +400,33 @@ with col_graph:
             )
             
             if view_mode == "Keturunan (Descendants) Saja":
-                subG = get_full_subgraph(G, graph_root)
+                graph_view = VIEW_DESCENDANTS
+                total_jobs = graph_index.descendant_count(graph_root) + 1
                 info_text = "Job ini dan semua keturunannya."
             else: 
-                subG = get_full_predecessor_subgraph(G, graph_root)
+                graph_view = VIEW_ANCESTORS
+                total_jobs = graph_index.ancestor_count(graph_root) + 1
                 info_text = "Job ini dan semua asal muasalnya."
             
-            st.info(f"Mode Graph Interaktif. {info_text} Total **{subG.number_of_nodes()}** jobs.")
+            st.info(f"Mode Graph Interaktif. {info_text} Total **{total_jobs}** jobs.")
 
-            net = Network(height="600px", width="100%", directed=True, bgcolor="#f8f9fa", font_color="#212529")
+            html_content, n_rendered, lod_depth = get_graph_html(
+                graph_index, os.stat(JOB_FILE).st_mtime_ns, graph_root, graph_view, GRAPH_LOD_NODE_LIMIT
+            )
+            if lod_depth is not None:
+                st.caption(
+                    f"Graph besar (> {GRAPH_LOD_NODE_LIMIT} jobs): menampilkan {n_rendered} dari {total_jobs} jobs "
+                    f"sampai level {lod_depth}, level lebih dalam dilipat menjadi node cluster. Physics dimatikan."
+                )
 
-            tempG = subG.copy() 
-            for u, v, d in tempG.edges(data=True):
-                d.clear() 
-            
-            net.from_nx(tempG)
-            
-            for node in net.nodes:
-                node['color'] = "#007bff"
-                node['size'] = 15
-            
-            if graph_root in subG.nodes:
-                for node in net.nodes:
-                    if node['id'] == graph_root:
-                        node['color'] = "#dc3545"
-                        node['size'] = 25
-                        node['title'] = "Root Job (Fokus)"
-                        break 
-            
-            net.show_buttons(filter_=['physics'])
-            html_file_name = f"dependency_graph_{graph_root.replace(' ', '_')}.html"
-            net.save_graph(html_file_name)
-            
-            if os.path.exists(html_file_name):
-                 with open(html_file_name, "r", encoding="utf-8") as f:
-                    html_content = f.read()
-                    components.html(html_content, height=650, scrolling=True) 
-            else:
-                st.error("Gagal membaca file HTML untuk Pyvis.")
+            components.html(html_content, height=650, scrolling=True) 
 
-            with open(html_file_name, "rb") as f:
-                st.download_button(
-                    label="⬇️ Download Graph (HTML)",
-                    data=f,
-                    file_name=html_file_name,
-                    mime="text/html"
-                )
+            st.download_button(
+                label="⬇️ Download Graph (HTML)",
+                data=html_content.encode("utf-8"),
+                file_name=f"dependency_graph_{graph_root.replace(' ', '_')}.html",
+                mime="text/html"
+            )
 
         except Exception as e:
             st.error(f"❌ Terjadi error tak terduga saat menampilkan visualisasi. Detail: {e}")
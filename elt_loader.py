@@ -0,0 +1,384 @@
+import datetime
+import os
+import queue
+import threading
+from decimal import Decimal
+
+import jaydebeapi
+import psycopg2
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pandas as pd
+
+from arrow_fetch import arrow_types_from_description, rows_to_arrow
+
+# Loader Netezza -> PostgreSQL yang dipakai ulang oleh notebook ELT Python.IPYNB.
+# Query sumber dijalankan SATU kali lalu hasilnya di-stream per batch (fetchmany),
+# menggantikan pola LIMIT/OFFSET yang menjalankan ulang seluruh CTE di tiap batch.
+
+DEFAULT_BATCH_SIZE = 100000
+NETEZZA_DRIVER = "org.netezza.Driver"
+
+# Baris per potongan CSV yang dikirim ke COPY, dan ukuran read() psycopg2
+COPY_CHUNK_ROWS = 10000
+COPY_READ_SIZE = 1 << 20
+
+# Jumlah batch yang boleh sudah di-fetch sebelum di-load (mode pipelined)
+PREFETCH_DEPTH = 2
+
+MODE_RECREATE = "recreate"         # DROP + CREATE lalu load penuh
+MODE_APPEND = "append"             # tambahkan ke tabel yang sudah ada
+MODE_SWAP = "swap"                 # load penuh ke tabel staging, lalu isi target diganti (atomik)
+# MODE_SWAP memakai TRUNCATE + INSERT ... SELECT (bukan DROP + RENAME), jadi view yang
+# bergantung pada target, grant, index dan comment tetap ada. Batasan: kolom target harus
+# sama dengan `columns` (perubahan skema -> MODE_RECREATE), data ditulis dua kali (staging
+# lalu target), TRUNCATE gagal jika target direferensikan foreign key tabel lain, dan
+# pembaca target menunggu lock sampai commit.
+MODE_INCREMENTAL = "incremental"   # load partisi >= watermark, lalu ganti partisi itu di target (atomik)
+
+# Tabel staging untuk MODE_SWAP / MODE_INCREMENTAL: "<tabel>_staging"
+STAGING_SUFFIX = "_staging"
+
+
+def connect_netezza(host, port, database, user, password, jdbc_driver_loc=os.path.join("D:\\nzjdbc.jar")):
+    return jaydebeapi.connect(
+        NETEZZA_DRIVER,
+        f"jdbc:netezza://{host}:{port}/{database}",
+        [user, password],
+        jdbc_driver_loc
+    )
+
+
+def create_table_sql(table, columns, if_not_exists=False):
+    # columns: list of (nama_kolom, tipe_postgres)
+    column_defs = ",\n    ".join(f"{name} {pg_type}" for name, pg_type in columns)
+    exists = "IF NOT EXISTS " if if_not_exists else ""
+    return f'CREATE TABLE {exists}"{table}" (\n    {column_defs}\n);'
+
+
+def sql_literal(value):
+    # Literal SQL untuk nilai watermark dari PostgreSQL (date, angka, atau string periode)
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, datetime.date):
+        value = value.isoformat()
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def get_watermark(pg_cursor, table, column):
+    # Nilai partisi terakhir yang sudah ada di target (None jika tabel masih kosong)
+    pg_cursor.execute(f'SELECT MAX({column}) FROM "{table}";')
+    return pg_cursor.fetchone()[0]
+
+
+def watermark_query(query, column, watermark):
+    # Batasi query sumber ke partisi >= watermark. Partisi terakhir ikut diambil ulang
+    # karena bisa saja belum lengkap saat load sebelumnya.
+    if watermark is None:
+        return query
+    return f"SELECT * FROM ({query}) elt_wm WHERE {column} >= {sql_literal(watermark)}"
+
+
+def iter_source_batches(cursor, query, batch_size=DEFAULT_BATCH_SIZE, keyset_column=None):
+    # Yield batch sebagai tabel Arrow (tipe dari metadata JDBC, lihat arrow_fetch.py).
+    # Default: satu execute, lalu fetchmany dari result set yang sama (cursor di server).
+    # keyset_column: alternatif untuk sumber yang tidak bisa menahan cursor lama;
+    # halaman berikutnya diambil dengan "WHERE key > nilai_terakhir" (key harus unik,
+    # dan query sumber tidak boleh punya ORDER BY/LIMIT sendiri).
+    if keyset_column is None:
+        cursor.execute(query)
+        column_types = arrow_types_from_description(cursor.description)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows_to_arrow(rows, column_types)
+        return
+
+    page_sql = f"SELECT * FROM ({query}) elt_src"
+    last_key = None
+    while True:
+        if last_key is None:
+            cursor.execute(f"{page_sql} ORDER BY {keyset_column} LIMIT {batch_size}")
+        else:
+            cursor.execute(
+                f"{page_sql} WHERE {keyset_column} > ? ORDER BY {keyset_column} LIMIT {batch_size}",
+                [last_key]
+            )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        names = [desc[0].lower() for desc in cursor.description]
+        last_key = rows[-1][names.index(keyset_column.lower())]
+        yield rows_to_arrow(rows, arrow_types_from_description(cursor.description))
+        if len(rows) < batch_size:
+            break
+
+
+def clean_table(table):
+    # Hapus karakter NULL dan newline (mencegah error "literal newline found in data").
+    # Operasi vektor Arrow, hanya pada kolom string.
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column = pc.replace_substring(table.column(i), "\x00", "")
+            column = pc.replace_substring_regex(column, "[\r\n]", " ")
+            table = table.set_column(i, field, column)
+    return table
+
+
+# Tipe PostgreSQL di `columns` -> tipe Arrow target untuk coerce_table
+_PG_NUMERIC_TYPES = ("FLOAT", "DOUBLE", "REAL", "NUMERIC", "DECIMAL")
+_PG_INTEGER_TYPES = ("INT", "BIGINT", "SMALLINT", "INTEGER")
+
+
+def _target_type(pg_type):
+    base = pg_type.strip().upper().split("(")[0].strip()
+    if base.startswith(_PG_NUMERIC_TYPES):
+        return pa.float64()
+    if base in _PG_INTEGER_TYPES:
+        return pa.int64()
+    if base == "DATE":
+        return pa.date32()
+    if base.startswith("TIMESTAMP"):
+        return pa.timestamp("us")
+    return None
+
+
+def _coerce_column(column, target):
+    # Cast Arrow dulu (cepat); jika ada nilai yang tidak valid, ulang lewat pandas dengan
+    # errors='coerce' sehingga nilai itu jadi NULL (sama dengan cleaning notebook lama)
+    try:
+        return column.cast(target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        pass
+    values = column.to_pandas()
+    if pa.types.is_date32(target):
+        values = pd.to_datetime(values, errors="coerce", format="mixed").dt.date
+    elif pa.types.is_timestamp(target):
+        values = pd.to_datetime(values, errors="coerce", format="mixed")
+    else:
+        values = pd.to_numeric(values, errors="coerce")
+        if pa.types.is_integer(target):
+            values = values.where(values == values.round())
+    return pa.array(values, type=target, from_pandas=True)
+
+
+def coerce_table(table, columns):
+    # Kolom FLOAT/NUMERIC/INT/DATE/TIMESTAMP (menurut tipe yang dideklarasikan di `columns`,
+    # urutan sama dengan SELECT) di-cast ke tipe itu; nilai rusak jadi NULL, bukan error COPY
+    for i, (_, pg_type) in enumerate(columns[:table.num_columns]):
+        target = _target_type(pg_type)
+        field = table.schema.field(i)
+        if target is None or field.type == target:
+            continue
+        table = table.set_column(i, field.with_type(target), _coerce_column(table.column(i), target))
+    return table
+
+
+class IteratorFile:
+    # Objek file read-only di atas generator bytes, supaya copy_expert bisa membaca
+    # CSV potongan demi potongan tanpa membangun seluruh string CSV di memori.
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._chunk = b""
+        self._pos = 0
+
+    def read(self, size=-1):
+        parts = []
+        remaining = size
+        while remaining != 0:
+            if self._pos >= len(self._chunk):
+                try:
+                    self._chunk = next(self._chunks)
+                except StopIteration:
+                    break
+                self._pos = 0
+                continue
+            end = len(self._chunk) if remaining < 0 else min(len(self._chunk), self._pos + remaining)
+            parts.append(self._chunk[self._pos:end])
+            if remaining > 0:
+                remaining -= end - self._pos
+            self._pos = end
+        return b"".join(parts)
+
+
+def csv_chunks(table, chunk_rows=COPY_CHUNK_ROWS):
+    options = pacsv.WriteOptions(include_header=False, delimiter="|")
+    for batch in table.to_batches(max_chunksize=chunk_rows):
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(batch, sink, options)
+        yield sink.getvalue().to_pybytes()
+
+
+def copy_table(pg_cursor, table, target_table, column_names):
+    # COPY ... FROM STDIN format CSV: NULL = field kosong tanpa quote, "" = string kosong
+    columns_sql = ", ".join(column_names)
+    pg_cursor.copy_expert(
+        f"""COPY "{target_table}" ({columns_sql}) FROM STDIN WITH (FORMAT csv, DELIMITER '|', NULL '')""",
+        IteratorFile(csv_chunks(table)),
+        size=COPY_READ_SIZE
+    )
+
+
+def prefetch(batches, depth=PREFETCH_DEPTH):
+    # Jalankan generator `batches` di thread lain, jadi fetch batch N+1 berjalan
+    # bersamaan dengan load batch N.
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producer():
+        try:
+            for batch in batches:
+                if not put(batch):
+                    return
+            put(done)
+        except BaseException as e:
+            put(e)
+        finally:
+            # Generator sumber ditutup di thread ini, sebelum pemanggil menutup cursor-nya
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def swap_tables(pg_cursor, staging, table, column_names):
+    # Dalam satu transaksi: isi target diganti isi staging, objek target sendiri (view,
+    # grant, index, comment) tidak disentuh. Gagal di tengah -> rollback, target utuh.
+    columns_sql = ", ".join(column_names)
+    pg_cursor.execute(f'TRUNCATE TABLE "{table}";')
+    pg_cursor.execute(f'INSERT INTO "{table}" ({columns_sql}) SELECT {columns_sql} FROM "{staging}";')
+    pg_cursor.execute(f'DROP TABLE "{staging}";')
+
+
+def merge_partitions(pg_cursor, staging, table, column, column_names):
+    # Upsert per partisi: partisi yang ada di staging diganti seluruhnya di target
+    columns_sql = ", ".join(column_names)
+    pg_cursor.execute(
+        f'DELETE FROM "{table}" t USING (SELECT DISTINCT {column} FROM "{staging}") s '
+        f'WHERE t.{column} IS NOT DISTINCT FROM s.{column};'
+    )
+    pg_cursor.execute(f'INSERT INTO "{table}" ({columns_sql}) SELECT {columns_sql} FROM "{staging}";')
+    pg_cursor.execute(f'DROP TABLE "{staging}";')
+
+
+def load_query(nz_conn, pg_conn, query, table, columns, mode=MODE_RECREATE,
+               batch_size=DEFAULT_BATCH_SIZE, keyset_column=None, pipelined=True, watermark_column=None):
+    # Jalankan query di Netezza dan load hasilnya ke tabel PostgreSQL `table`.
+    # Urutan `columns` harus sama dengan urutan kolom SELECT. Return jumlah baris.
+    # pipelined: fetch + cleaning batch berikutnya berjalan di thread terpisah.
+    # MODE_SWAP / MODE_INCREMENTAL: batch di-load ke "<table>_staging", target baru
+    # berubah di commit terakhir. MODE_INCREMENTAL butuh watermark_column (mis. trn_dt,
+    # periode) yang ada di hasil query sumber maupun di `columns`.
+    column_names = [name for name, _ in columns]
+    pg_cursor = pg_conn.cursor()
+    nz_cursor = nz_conn.cursor()
+    total = 0
+    target = table
+    batches = None
+    try:
+        if mode == MODE_RECREATE:
+            print(f"Menghapus tabel {table} pada PostgreSQL...")
+            pg_cursor.execute(f'DROP TABLE IF EXISTS "{table}";')
+            pg_cursor.execute(create_table_sql(table, columns))
+            pg_conn.commit()
+            print(f"Tabel {table} telah dibuat ulang.")
+        elif mode in (MODE_SWAP, MODE_INCREMENTAL):
+            if mode == MODE_INCREMENTAL and watermark_column is None:
+                raise ValueError("Mode incremental membutuhkan watermark_column")
+            # Target dibuat sekali di run pertama; run berikutnya hanya isinya yang diganti
+            pg_cursor.execute(create_table_sql(table, columns, if_not_exists=True))
+            if mode == MODE_INCREMENTAL:
+                watermark = get_watermark(pg_cursor, table, watermark_column)
+                print(f"Watermark {table}.{watermark_column}: {watermark}")
+                query = watermark_query(query, watermark_column, watermark)
+            target = table + STAGING_SUFFIX
+            pg_cursor.execute(f'DROP TABLE IF EXISTS "{target}";')
+            pg_cursor.execute(create_table_sql(target, columns))
+            pg_conn.commit()
+        elif mode != MODE_APPEND:
+            raise ValueError(f"Mode load tidak dikenal: {mode}")
+
+        batches = (
+            coerce_table(clean_table(batch), columns)
+            for batch in iter_source_batches(nz_cursor, query, batch_size, keyset_column)
+        )
+        if pipelined:
+            batches = prefetch(batches)
+
+        for batch in batches:
+            copy_table(pg_cursor, batch, target, column_names)
+            pg_conn.commit()
+            total += batch.num_rows
+            print(f"Batch {total} inserted.")
+
+        if mode == MODE_SWAP:
+            swap_tables(pg_cursor, target, table, column_names)
+            pg_conn.commit()
+            print(f"Isi tabel {table} diganti dengan {target}.")
+        elif mode == MODE_INCREMENTAL:
+            merge_partitions(pg_cursor, target, table, watermark_column, column_names)
+            pg_conn.commit()
+            print(f"Partisi baru dari {target} digabung ke {table}.")
+    finally:
+        # Hentikan producer prefetch (stop + join) dulu; thread-nya masih bisa fetch dari
+        # nz_cursor jika copy_table gagal di tengah
+        if batches is not None:
+            batches.close()
+        nz_cursor.close()
+        pg_cursor.close()
+    return total
+
+
+def run_elt(nz_config, pg_config, query, table, columns, mode=MODE_RECREATE,
+            batch_size=DEFAULT_BATCH_SIZE, keyset_column=None, pipelined=True, watermark_column=None):
+    # Versi satu-sel untuk notebook: buka koneksi, load, tutup koneksi
+    nz_conn = None
+    pg_conn = None
+    total = 0
+    try:
+        pg_conn = psycopg2.connect(**pg_config)
+        nz_conn = connect_netezza(**nz_config)
+        total = load_query(nz_conn, pg_conn, query, table, columns, mode, batch_size, keyset_column, pipelined,
+                           watermark_column)
+        print(f"{total} baris data berhasil dimasukkan ke tabel {table}.")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        if nz_conn is not None:
+            nz_conn.close()
+        if pg_conn is not None:
+            pg_conn.close()
+
+    print("ELT selesai.")
+    return total
@@ -0,0 +1,149 @@
+import os
+import shutil
+import time
+
+import pandas as pd
+from joblib import Memory
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingRandomSearchCV, RandomizedSearchCV, check_cv
+from sklearn.pipeline import Pipeline
+
+# Pipeline training + pencarian hyperparameter untuk test_financing_model.ipynb.
+# Tahap preprocessing (ColumnTransformer + scaler) tidak bergantung pada hyperparameter
+# model, jadi hasil fit-nya di-cache per fold lewat joblib Memory (Pipeline(memory=...)):
+# kandidat lain di fold yang sama (dan run berikutnya) memakai transformer yang sudah di-fit.
+# Pencarian berjalan paralel antar proses (n_jobs, backend loky) dan bisa memakai
+# successive halving untuk membuang kandidat lemah lebih awal.
+
+CACHE_DIR = ".model_cache"
+
+SEARCH_RANDOM = "random"
+SEARCH_GRID = "grid"
+SEARCH_HALVING = "halving"
+
+# Folder joblib untuk fungsi sklearn yang di-cache per step transformer Pipeline
+# (_fit_transform_one, di versi baru _fit_transform_one_with_callbacks)
+_CACHED_MODULE_DIR = os.path.join("joblib", "sklearn", "pipeline")
+_CACHED_FUNCTION_PREFIX = "_fit_transform_one"
+
+
+def make_pipeline(transformer, model, scaler=None, memory=CACHE_DIR):
+    # Susunan step sama dengan notebook: preprocessing -> scaler -> model
+    steps = [("preprocessing", transformer)]
+    if scaler is not None:
+        steps.append(("scaler", scaler))
+    steps.append(("model", model))
+    if isinstance(memory, str):
+        memory = Memory(memory, verbose=0)
+    return Pipeline(steps, memory=memory)
+
+
+def _cache_entries(location):
+    # Jumlah hasil fit transformer yang tersimpan (satu folder per kombinasi input unik)
+    path = os.path.join(location, _CACHED_MODULE_DIR)
+    if not os.path.isdir(path):
+        return 0
+    return sum(
+        1
+        for function_dir in os.scandir(path)
+        if function_dir.is_dir() and function_dir.name.startswith(_CACHED_FUNCTION_PREFIX)
+        for entry in os.scandir(function_dir.path)
+        if entry.is_dir()
+    )
+
+
+def _cached_steps(pipeline):
+    return sum(1 for _, step in pipeline.steps[:-1] if step is not None and step != "passthrough")
+
+
+def clear_cache(location=CACHE_DIR):
+    shutil.rmtree(location, ignore_errors=True)
+
+
+class SearchReport:
+    def __init__(self, name, kind, seconds, candidates, fits, cache_calls, cache_misses,
+                 best_params, best_score):
+        self.name = name
+        self.kind = kind
+        self.seconds = seconds
+        self.candidates = candidates
+        self.fits = fits
+        self.cache_calls = cache_calls
+        self.cache_misses = cache_misses
+        self.best_params = best_params
+        self.best_score = best_score
+
+    @property
+    def hit_rate(self):
+        # Perkiraan: dua proses yang menghitung entri yang sama bersamaan tercatat satu miss
+        if not self.cache_calls:
+            return None
+        return max(0.0, 1 - self.cache_misses / self.cache_calls)
+
+    def as_dict(self):
+        return {
+            "search": self.name,
+            "kind": self.kind,
+            "seconds": round(self.seconds, 2),
+            "candidates": self.candidates,
+            "fits": self.fits,
+            "cache_calls": self.cache_calls,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": None if self.hit_rate is None else round(self.hit_rate, 3),
+            "best_score": self.best_score,
+            "best_params": self.best_params,
+        }
+
+
+def make_search(pipeline, params, kind=SEARCH_RANDOM, n_iter=20, cv=5, scoring="neg_mean_absolute_error",
+                n_jobs=-1, random_state=42, resource="n_samples", factor=3, min_resources="exhaust",
+                max_resources="auto"):
+    if kind == SEARCH_GRID:
+        return GridSearchCV(pipeline, params, cv=cv, scoring=scoring, n_jobs=n_jobs)
+    if kind == SEARCH_RANDOM:
+        return RandomizedSearchCV(
+            pipeline, params, n_iter=n_iter, cv=cv, scoring=scoring, n_jobs=n_jobs, random_state=random_state
+        )
+    if kind == SEARCH_HALVING:
+        # resource="model__n_estimators": data tiap iterasi sama, jadi preprocessing per fold
+        # cukup di-fit sekali; resource="n_samples" memakai subset baris yang makin besar
+        if resource != "n_samples":
+            # Nilai resource diatur oleh halving, bukan dicari; batas atas = nilai terbesar di grid
+            if max_resources == "auto":
+                if resource not in params:
+                    raise ValueError(f"max_resources harus diisi untuk resource {resource}")
+                max_resources = max(params[resource])
+            params = {key: value for key, value in params.items() if key != resource}
+        return HalvingRandomSearchCV(
+            pipeline, params, n_candidates=n_iter, cv=cv, scoring=scoring, n_jobs=n_jobs,
+            random_state=random_state, resource=resource, factor=factor, min_resources=min_resources,
+            max_resources=max_resources,
+        )
+    raise ValueError(f"Jenis pencarian tidak dikenal: {kind}")
+
+
+def run_search(name, pipeline, params, X, y, kind=SEARCH_RANDOM, **search_kwargs):
+    # Fit pencarian + SearchReport (waktu, jumlah fit, cache hit rate transformer)
+    search = make_search(pipeline, params, kind=kind, **search_kwargs)
+    location = getattr(pipeline.memory, "location", pipeline.memory) if pipeline.memory is not None else None
+    before = _cache_entries(location) if location else 0
+
+    start = time.perf_counter()
+    search.fit(X, y)
+    seconds = time.perf_counter() - start
+
+    n_splits = check_cv(search.cv).get_n_splits(X, y)
+    candidates = len(search.cv_results_["params"])
+    fits = candidates * n_splits + (1 if search.refit else 0)
+    cache_calls = fits * _cached_steps(pipeline) if location else 0
+    cache_misses = _cache_entries(location) - before if location else 0
+
+    report = SearchReport(
+        name, kind, seconds, candidates, fits, cache_calls, cache_misses,
+        search.best_params_, float(search.best_score_),
+    )
+    return search, report
+
+
+def search_summary(reports):
+    return pd.DataFrame([report.as_dict() for report in reports])
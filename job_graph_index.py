@@ -0,0 +1,371 @@
+import hashlib
+import os
+import tempfile
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+# Nama job yang dianggap kosong / tidak valid di job_hirarki.xlsx
+INVALID_JOB_NAMES = {"nan", "not available", ""}
+
+# Folder cache index graph (relatif ke direktori kerja Streamlit)
+CACHE_DIR = ".job_graph_cache"
+
+# Naikkan jika format file cache berubah supaya cache lama di-rebuild
+CACHE_VERSION = 2
+
+
+class JobGraphIndex:
+    # Index graph job dalam bentuk array integer: node i <-> names[i],
+    # edge k = src[k] -> dst[k] (Sequence -> JOB Name), berasal dari baris Excel edge_rows[k].
+    def __init__(self, names, src, dst, topo_order, has_cycle, edge_rows=None):
+        self.names = [str(name) for name in names]
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        if edge_rows is None:
+            edge_rows = np.zeros(len(self.src), dtype=np.int32)
+        self.edge_rows = np.asarray(edge_rows, dtype=np.int32)
+        self.topo_order = np.asarray(topo_order, dtype=np.int32)
+        self.has_cycle = bool(has_cycle)
+
+        self.id_of = {name: i for i, name in enumerate(self.names)}
+        self.sorted_names = sorted(self.names)
+
+        self._succ = [[] for _ in self.names]
+        self._pred = [[] for _ in self.names]
+        for u, v in zip(self.src.tolist(), self.dst.tolist()):
+            self._succ[u].append(v)
+            self._pred[v].append(u)
+
+        self._graph = None
+        self._desc_bits = None
+        self._anc_bits = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.id_of
+
+    def successors(self, name):
+        return [self.names[v] for v in self._succ[self.id_of[name]]]
+
+    def predecessors(self, name):
+        return [self.names[u] for u in self._pred[self.id_of[name]]]
+
+    def roots(self):
+        return [self.names[i] for i, pred in enumerate(self._pred) if not pred]
+
+    def build_reachability(self):
+        # Transitive closure sebagai bitset (int Python, bit i = node i), dihitung sekali
+        # sepanjang urutan topologis: desc[u] = OR(bit v | desc[v]) untuk v anak u.
+        if self.has_cycle:
+            raise ValueError("Reachability index membutuhkan graph tanpa cycle")
+        if self._desc_bits is not None:
+            return
+
+        order = self.topo_order.tolist()
+        desc = [0] * len(self.names)
+        for u in reversed(order):
+            bits = 0
+            for v in self._succ[u]:
+                bits |= (1 << v) | desc[v]
+            desc[u] = bits
+
+        anc = [0] * len(self.names)
+        for v in order:
+            bits = 0
+            for u in self._pred[v]:
+                bits |= (1 << u) | anc[u]
+            anc[v] = bits
+
+        self._desc_bits = desc
+        self._anc_bits = anc
+
+    def _bits_to_names(self, bits):
+        if not bits:
+            return []
+        raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        ids = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        return [self.names[i] for i in ids.tolist()]
+
+    def descendant_count(self, name):
+        self.build_reachability()
+        return self._desc_bits[self.id_of[name]].bit_count()
+
+    def ancestor_count(self, name):
+        self.build_reachability()
+        return self._anc_bits[self.id_of[name]].bit_count()
+
+    def descendants(self, name):
+        self.build_reachability()
+        return self._bits_to_names(self._desc_bits[self.id_of[name]])
+
+    def ancestors(self, name):
+        self.build_reachability()
+        return self._bits_to_names(self._anc_bits[self.id_of[name]])
+
+    def descendant_edges(self, name):
+        # Semua edge (Parent, Child) di bawah root, pengganti nx.edge_dfs untuk export CSV
+        edges = []
+        for parent in [name] + self.descendants(name):
+            edges.extend((parent, self.names[v]) for v in self._succ[self.id_of[parent]])
+        return edges
+
+    def descendant_subgraph(self, name):
+        return self.to_networkx().subgraph([name] + self.descendants(name))
+
+    def ancestor_subgraph(self, name):
+        return self.to_networkx().subgraph(self.ancestors(name) + [name])
+
+    def to_networkx(self):
+        # DiGraph dibangun sekali dari array lalu dipakai ulang (pyvis, shortest_path)
+        if self._graph is None:
+            G = nx.DiGraph()
+            G.add_nodes_from(self.names)
+            G.add_edges_from(
+                (self.names[u], self.names[v]) for u, v in zip(self.src.tolist(), self.dst.tolist())
+            )
+            self._graph = G
+        return self._graph
+
+
+def topological_order(n_nodes, src, dst):
+    # Kahn's algorithm; jika ada cycle, urutan yang dikembalikan lebih pendek dari n_nodes
+    indegree = np.bincount(np.asarray(dst, dtype=np.int64), minlength=n_nodes).tolist()
+    succ = [[] for _ in range(n_nodes)]
+    for u, v in zip(np.asarray(src).tolist(), np.asarray(dst).tolist()):
+        succ[u].append(v)
+
+    order = [i for i in range(n_nodes) if indegree[i] == 0]
+    head = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        for v in succ[u]:
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order.append(v)
+    return order
+
+
+def build_job_graph_index(df):
+    # Pembersihan sama dengan versi lama di dependency_job.py, tapi tanpa iterrows
+    jobs = df["JOB Name"].fillna("").astype(str).str.strip()
+    seqs = df["Sequence"].fillna("").astype(str).str.strip()
+
+    valid_jobs = jobs[~jobs.str.lower().isin(INVALID_JOB_NAMES)]
+    names = list(pd.unique(valid_jobs))
+    id_of = {name: i for i, name in enumerate(names)}
+
+    src = seqs.map(id_of)
+    dst = jobs.map(id_of)
+    mask = src.notna() & dst.notna() & (src != dst)
+
+    # Nomor baris di workbook (baris 1 = header) untuk diagnosa loop
+    rows = np.arange(len(df), dtype=np.int32) + 2
+    edges = pd.DataFrame({"src": src[mask], "dst": dst[mask], "row": rows[mask.to_numpy()]}).astype(np.int32)
+    edges = edges.drop_duplicates(subset=["src", "dst"])
+
+    order = topological_order(len(names), edges["src"].to_numpy(), edges["dst"].to_numpy())
+    return JobGraphIndex(
+        names,
+        edges["src"].to_numpy(),
+        edges["dst"].to_numpy(),
+        order,
+        has_cycle=len(order) < len(names),
+        edge_rows=edges["row"].to_numpy(),
+    )
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_path(path, cache_dir):
+    return os.path.join(cache_dir, os.path.basename(path) + ".npz")
+
+
+def read_npz_cache(cache_path, version):
+    # Isi file cache .npz sebagai dict, atau None jika tidak ada / rusak / versi lain
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if int(data["version"]) != version:
+                return None
+            return {key: data[key] for key in data.files}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write_npz_cache(cache_path, version, **arrays):
+    # Tulis ke file sementara lalu os.replace supaya proses lain tidak membaca file setengah jadi
+    cache_dir = os.path.dirname(cache_path) or "."
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, version=np.int32(version), **arrays)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Cache hanya optimasi; kalau gagal tulis, app tetap jalan dengan data di memori
+        pass
+
+
+def _write_cache(cache_path, index, source_mtime_ns, source_size, source_hash):
+    write_npz_cache(
+        cache_path,
+        CACHE_VERSION,
+        source_mtime_ns=np.int64(source_mtime_ns),
+        source_size=np.int64(source_size),
+        source_hash=np.str_(source_hash),
+        names=np.array(index.names, dtype=str),
+        src=index.src,
+        dst=index.dst,
+        edge_rows=index.edge_rows,
+        topo_order=index.topo_order,
+        has_cycle=np.bool_(index.has_cycle),
+    )
+
+
+def _index_from_cache(cached):
+    return JobGraphIndex(
+        cached["names"].tolist(),
+        cached["src"],
+        cached["dst"],
+        cached["topo_order"],
+        bool(cached["has_cycle"]),
+        cached["edge_rows"],
+    )
+
+
+def load_job_graph_index(path, cache_dir=CACHE_DIR):
+    # Load index dari cache jika workbook tidak berubah (cek mtime+size, lalu hash);
+    # hanya workbook yang berubah yang memicu baca ulang Excel.
+    stat = os.stat(path)
+    cache_path = _cache_path(path, cache_dir)
+    cached = read_npz_cache(cache_path, CACHE_VERSION)
+
+    if (
+        cached is not None
+        and int(cached["source_mtime_ns"]) == stat.st_mtime_ns
+        and int(cached["source_size"]) == stat.st_size
+    ):
+        return _index_from_cache(cached)
+
+    digest = file_digest(path)
+    if cached is not None and str(cached["source_hash"]) == digest:
+        # Isi sama (mis. file hanya di-copy ulang): cukup perbarui mtime di cache
+        index = _index_from_cache(cached)
+    else:
+        df = pd.read_excel(path, usecols=["JOB Name", "Sequence"])
+        index = build_job_graph_index(df)
+
+    _write_cache(cache_path, index, stat.st_mtime_ns, stat.st_size, digest)
+    return index
+
+
+# ====================================================================
+# Diagnosa cycle: deteksi linear (Kahn) + contoh loop per SCC secara lazy
+# ====================================================================
+
+def cyclic_components(index):
+    # Tarjan iteratif, hanya pada node yang tidak masuk urutan topologis (sisa Kahn).
+    # Generator: SCC dengan >1 node di-yield begitu ditemukan.
+    in_order = np.zeros(len(index.names), dtype=bool)
+    in_order[index.topo_order] = True
+    residual = np.flatnonzero(~in_order).tolist()
+    if not residual:
+        return
+
+    succ = index._succ
+    low = {}
+    num = {}
+    on_stack = set()
+    stack = []
+    counter = 0
+
+    for start in residual:
+        if start in num:
+            continue
+        work = [(start, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                num[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack.add(v)
+            children = succ[v]
+            while i < len(children):
+                w = children[i]
+                i += 1
+                if w not in num:
+                    work.append((v, i))
+                    work.append((w, 0))
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], num[w])
+            else:
+                if low[v] == num[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1:
+                        yield component
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+
+
+def _cycle_in_component(index, component):
+    # BFS dari satu node kembali ke dirinya sendiri, dibatasi di dalam SCC
+    members = set(component)
+    start = component[0]
+    parent = {start: None}
+    queue = [start]
+    head = 0
+    while head < len(queue):
+        u = queue[head]
+        head += 1
+        for v in index._succ[u]:
+            if v == start:
+                path = [u]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                return path[::-1]
+            if v in members and v not in parent:
+                parent[v] = u
+                queue.append(v)
+    return [start]
+
+
+def iter_cycles(index, limit=5):
+    # Maksimal `limit` contoh loop, satu per strongly connected component.
+    # Tiap contoh berisi urutan job dan baris workbook (JOB Name/Sequence) pembentuk loop.
+    if not index.has_cycle:
+        return
+    edge_row = {
+        (u, v): row
+        for u, v, row in zip(index.src.tolist(), index.dst.tolist(), index.edge_rows.tolist())
+    }
+    for n_found, component in enumerate(cyclic_components(index)):
+        if n_found >= limit:
+            return
+        path = _cycle_in_component(index, component)
+        rows = []
+        for u, v in zip(path, path[1:] + path[:1]):
+            rows.append((edge_row[(u, v)], index.names[v], index.names[u]))
+        yield {
+            "jobs": [index.names[i] for i in path],
+            "component_size": len(component),
+            "rows": rows,
+        }
@@ -0,0 +1,129 @@
+from pyvis.network import Network
+
+# Di atas jumlah node ini graph dirender dengan level-of-detail (LOD)
+LOD_NODE_LIMIT = 300
+
+NODE_COLOR = "#007bff"
+ROOT_COLOR = "#dc3545"
+CLUSTER_COLOR = "#6c757d"
+
+VIEW_DESCENDANTS = "descendants"
+VIEW_ANCESTORS = "ancestors"
+
+
+def _levels_from_root(index, root, nodes, view):
+    # BFS dari root (arah anak untuk descendants, arah induk untuk ancestors)
+    step = index.successors if view == VIEW_DESCENDANTS else index.predecessors
+    level = {root: 0}
+    queue = [root]
+    head = 0
+    while head < len(queue):
+        u = queue[head]
+        head += 1
+        for v in step(u):
+            if v in nodes and v not in level:
+                level[v] = level[u] + 1
+                queue.append(v)
+    return level
+
+
+def _lod_depth(level, limit):
+    # Kedalaman terbesar yang jumlah node-nya masih <= limit (minimal 1)
+    per_depth = {}
+    for depth in level.values():
+        per_depth[depth] = per_depth.get(depth, 0) + 1
+    total = 0
+    max_depth = 1
+    for depth in sorted(per_depth):
+        total += per_depth[depth]
+        if total > limit:
+            break
+        max_depth = depth
+    return max(max_depth, 1)
+
+
+def build_vis_payload(index, root, view=VIEW_DESCENDANTS, lod_limit=LOD_NODE_LIMIT):
+    # Node/edge dict vis.js langsung dari reachability index, tanpa copy DiGraph.
+    # Return (nodes, edges, lod_depth); lod_depth None jika graph dirender penuh.
+    if view == VIEW_DESCENDANTS:
+        related = index.descendants(root)
+    else:
+        related = index.ancestors(root)
+    nodes = set(related)
+    nodes.add(root)
+
+    level = _levels_from_root(index, root, nodes, view)
+    lod_depth = _lod_depth(level, lod_limit) if len(nodes) > lod_limit else None
+    visible = nodes if lod_depth is None else {n for n in nodes if level[n] <= lod_depth}
+
+    vis_nodes = []
+    for name in sorted(visible, key=lambda n: (level[n], n)):
+        node = {"id": name, "label": name, "shape": "dot", "color": NODE_COLOR, "size": 15}
+        if name == root:
+            node.update(color=ROOT_COLOR, size=25, title="Root Job (Fokus)")
+        if lod_depth is not None:
+            node["level"] = level[name]
+        vis_nodes.append(node)
+
+    vis_edges = []
+    for u in visible:
+        for v in index.successors(u):
+            if v in visible:
+                vis_edges.append({"from": u, "to": v, "arrows": "to"})
+
+    if lod_depth is not None:
+        # Level yang lebih dalam dilipat menjadi satu node cluster per node di batas LOD
+        step_all = index.descendants if view == VIEW_DESCENDANTS else index.ancestors
+        for name in visible:
+            if level[name] != lod_depth:
+                continue
+            hidden = sum(1 for n in step_all(name) if n in nodes and level[n] > lod_depth)
+            if not hidden:
+                continue
+            cluster_id = f"{name} (+{hidden})"
+            vis_nodes.append({
+                "id": cluster_id,
+                "label": f"+{hidden} job",
+                "title": f"{hidden} job lebih dalam dari level {lod_depth} di bawah {name}",
+                "shape": "box",
+                "color": CLUSTER_COLOR,
+                "level": lod_depth + 1,
+            })
+            if view == VIEW_DESCENDANTS:
+                vis_edges.append({"from": name, "to": cluster_id, "arrows": "to", "dashes": True})
+            else:
+                vis_edges.append({"from": cluster_id, "to": name, "arrows": "to", "dashes": True})
+
+    return vis_nodes, vis_edges, lod_depth
+
+
+def render_graph_html(index, root, view=VIEW_DESCENDANTS, lod_limit=LOD_NODE_LIMIT):
+    # HTML pyvis di memori (tanpa file sementara). Return (html, jumlah_job, lod_depth);
+    # jumlah_job = job yang digambar, node cluster LOD tidak dihitung
+    vis_nodes, vis_edges, lod_depth = build_vis_payload(index, root, view, lod_limit)
+
+    net = Network(height="600px", width="100%", directed=True, bgcolor="#f8f9fa", font_color="#212529")
+    net.nodes = vis_nodes
+    net.edges = vis_edges
+
+    if lod_depth is None:
+        net.show_buttons(filter_=["physics"])
+    else:
+        # Graph besar: physics mati, posisi dari layout hierarkis yang sudah dihitung (level)
+        net.options = {
+            "physics": {"enabled": False},
+            "layout": {
+                "hierarchical": {
+                    "enabled": True,
+                    "direction": "UD" if view == VIEW_DESCENDANTS else "DU",
+                    "sortMethod": "directed",
+                    "levelSeparation": 120,
+                    "nodeSpacing": 120,
+                }
+            },
+            "edges": {"smooth": False},
+            "interaction": {"hideEdgesOnDrag": True},
+        }
+
+    n_jobs = sum(1 for node in vis_nodes if node["color"] != CLUSTER_COLOR)
+    return net.generate_html(), n_jobs, lod_depth
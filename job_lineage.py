@@ -0,0 +1,368 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from job_graph_index import (
+    CACHE_DIR, INVALID_JOB_NAMES, file_digest, load_job_graph_index, read_npz_cache, write_npz_cache
+)
+
+# Engine lineage job + report, satu-satunya pembaca report_to_job_mapping.xlsx:
+# - graph job = JobGraphIndex dari job_hirarki.xlsx (index yang sama dengan Job Hierarchy
+#   Viewer, Sequence -> JOB Name) ditambah edge sheet Job_relationship (job_controller -> job_name)
+# - node report dari sheet report_match_job (kolom matched_jobs*) ditempel ke job-nya
+# - controller pertama tiap job (Job_relationship) untuk rantai Level_1..n di job_to_report.ipynb
+# Dipakai dependency_job.py (report terdampak) dan job_to_report.ipynb (lineage_frame,
+# report_job_status). Hasil build disimpan ke .npz (lihat load_lineage), jadi Excel hanya
+# dibaca saat berubah.
+
+HIERARCHY_FILE = "job_hirarki.xlsx"
+MAPPING_FILE = "report_to_job_mapping.xlsx"
+RELATIONSHIP_SHEET = "Job_relationship"
+REPORT_SHEET = "report_match_job"
+
+# Naikkan jika format file cache berubah supaya cache lama di-rebuild
+CACHE_VERSION = 2
+
+
+def _clean_names(values):
+    # Strip + kosongkan nama tidak valid (NaN, 'not available'); "" = tidak ada job
+    names = pd.Series(values, dtype=object)
+    names = names.where(names.notna(), "").astype(str).str.strip()
+    return names.where(~names.str.lower().isin(INVALID_JOB_NAMES), "")
+
+
+def _csr(n_rows, rows, cols):
+    # Adjacency rows -> cols dalam bentuk CSR: cols[ptr[i]:ptr[i + 1]] milik baris i
+    order = np.argsort(rows, kind="stable")
+    ptr = np.zeros(n_rows + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=ptr[1:])
+    return ptr, np.asarray(cols, dtype=np.int32)[order]
+
+
+def _expand(ptr, idx, frontier):
+    # Semua tetangga dari node di frontier sekaligus (tanpa loop Python per node)
+    starts = ptr[frontier]
+    counts = ptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=np.int32)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return idx[offsets + np.arange(total)]
+
+
+def _reach(n_nodes, ptr, idx, start):
+    # BFS per level dari node start (termasuk start); aman untuk graph yang punya loop
+    seen = np.zeros(n_nodes, dtype=bool)
+    seen[start] = True
+    frontier = np.asarray(start, dtype=np.int32)
+    while frontier.size:
+        neighbours = _expand(ptr, idx, frontier)
+        frontier = np.unique(neighbours[~seen[neighbours]])
+        seen[frontier] = True
+    return np.flatnonzero(seen)
+
+
+class LineageGraph:
+    # Job i <-> job_names[i], edge k = src[k] -> dst[k] (controller/Sequence -> job).
+    # Report r <-> report_names[r], pasangan link k = report link_report[k] memakai job link_job[k].
+    # parent[i] = controller pertama job i di Job_relationship (-1 = tidak ada).
+    def __init__(self, job_names, src, dst, report_names, link_report, link_job, parent=None):
+        self.job_names = [str(name) for name in job_names]
+        self.report_names = [str(name) for name in report_names]
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.link_report = np.asarray(link_report, dtype=np.int32)
+        self.link_job = np.asarray(link_job, dtype=np.int32)
+        if parent is None:
+            parent = np.full(len(self.job_names), -1, dtype=np.int32)
+        self.parent = np.asarray(parent, dtype=np.int32)
+
+        self.job_id = {name: i for i, name in enumerate(self.job_names)}
+        self.report_id = {name: i for i, name in enumerate(self.report_names)}
+
+        n_jobs = len(self.job_names)
+        self._succ = _csr(n_jobs, self.src, self.dst)
+        self._pred = _csr(n_jobs, self.dst, self.src)
+        self._job_reports = _csr(n_jobs, self.link_job, self.link_report)
+        self._report_jobs = _csr(len(self.report_names), self.link_report, self.link_job)
+        self._memo = {}
+        self._parents = None
+
+    def __contains__(self, job):
+        return job in self.job_id
+
+    def has_report(self, report):
+        return report in self.report_id
+
+    def _job_ids(self, job, direction):
+        key = (direction, job)
+        ids = self._memo.get(key)
+        if ids is None:
+            ptr, idx = self._succ if direction == "down" else self._pred
+            ids = _reach(len(self.job_names), ptr, idx, [self.job_id[job]])
+            self._memo[key] = ids
+        return ids
+
+    def report_links(self, job):
+        # Pasangan (report_name, job_name): report yang memakai job ini atau salah satu
+        # turunannya, beserta job turunan yang menghubungkannya
+        job_ids = self._job_ids(job, "down")
+        ptr, idx = self._job_reports
+        counts = ptr[job_ids + 1] - ptr[job_ids]
+        reports = _expand(ptr, idx, job_ids)
+        jobs = np.repeat(job_ids, counts)
+        links = pd.DataFrame({
+            "report_name": np.asarray(self.report_names, dtype=object)[reports],
+            "job_name": np.asarray(self.job_names, dtype=object)[jobs],
+        })
+        return links.sort_values(["report_name", "job_name"], ignore_index=True)
+
+    def reports_for_job(self, job):
+        # Report yang bergantung pada job ini (langsung atau lewat turunannya)
+        if job not in self.job_id:
+            return []
+        ptr, idx = self._job_reports
+        report_ids = np.unique(_expand(ptr, idx, self._job_ids(job, "down")))
+        return sorted(self.report_names[r] for r in report_ids.tolist())
+
+    def jobs_for_report(self, report):
+        # Job yang mengisi report: job di matched_jobs beserta rantai controller di atasnya
+        key = ("report", report)
+        names = self._memo.get(key)
+        if names is None:
+            ptr, idx = self._report_jobs
+            matched = np.unique(_expand(ptr, idx, np.asarray([self.report_id[report]], dtype=np.int32)))
+            if matched.size:
+                pred_ptr, pred_idx = self._pred
+                matched = _reach(len(self.job_names), pred_ptr, pred_idx, matched)
+            names = sorted(self.job_names[j] for j in matched.tolist())
+            self._memo[key] = names
+        return list(names)
+
+    def controller_paths(self, targets):
+        # Path [target, controller, ..., root] per target lewat controller pertama
+        if self._parents is None:
+            self._parents = {
+                self.job_names[i]: self.job_names[p] for i, p in enumerate(self.parent.tolist()) if p >= 0
+            }
+        return _resolve_paths(self._parents, targets)
+
+
+def _resolve_paths(parents, targets):
+    # Suffix path yang sudah pernah diselesaikan di-memo, jadi job bersama hanya ditelusuri
+    # sekali. Loop: path diakhiri "(loop to <job>)".
+    memo = {}
+    paths = []
+    for target in targets:
+        walked = []
+        seen = {}
+        job = target
+        while True:
+            suffix = memo.get(job)
+            if suffix is not None:
+                break
+            if job in seen:
+                # Job di dalam loop tidak di-memo (penanda loop bergantung titik masuk);
+                # job sebelum titik masuk di-memo seperti biasa di bawah.
+                entry = seen[job]
+                suffix = tuple(walked[entry:]) + (f"(loop to {job})",)
+                walked = walked[:entry]
+                break
+            seen[job] = len(walked)
+            walked.append(job)
+            parent = parents.get(job)
+            if parent is None:
+                suffix = ()
+                break
+            job = parent
+        for i in range(len(walked) - 1, -1, -1):
+            suffix = (walked[i],) + suffix
+            memo[walked[i]] = suffix
+        paths.append(suffix)
+    return paths
+
+
+def _lower_columns(df):
+    return df.rename(columns=lambda col: str(col).lower())
+
+
+def _relationship_edges(df_relationship):
+    # (controller, job) per baris sheet Job_relationship, nama sudah dibersihkan
+    df_relationship = _lower_columns(df_relationship)
+    return _clean_names(df_relationship["job_controller"]), _clean_names(df_relationship["job_name"])
+
+
+def _report_pairs(df_report):
+    # Satu pasangan (report, job) per sel matched_jobs* yang terisi, urut baris lalu kolom
+    df_report = _lower_columns(df_report)
+    job_cols = [col for col in df_report.columns if col.startswith("matched_jobs")]
+    reports = _clean_names(np.repeat(df_report["report_name"].to_numpy(dtype=object), len(job_cols)))
+    jobs = _clean_names(df_report[job_cols].to_numpy(dtype=object).ravel())
+    keep = ((reports != "") & (jobs != "")).to_numpy()
+    return reports[keep].reset_index(drop=True), jobs[keep].reset_index(drop=True)
+
+
+def build_lineage(index=None, df_relationship=None, df_report=None):
+    # index: JobGraphIndex job_hirarki.xlsx; df_relationship: job_name/job_controller;
+    # df_report: report_name + matched_jobs*. Semua sumber opsional (mis. notebook yang hanya
+    # membaca Job_relationship). Nama kolom relationship/report case-insensitive.
+    empty = pd.Series(dtype=object)
+    rel_parents, rel_children = (
+        _relationship_edges(df_relationship) if df_relationship is not None else (empty, empty)
+    )
+    report_names, report_jobs = _report_pairs(df_report) if df_report is not None else (empty, empty)
+
+    # ID job index tetap sama; job yang hanya ada di workbook mapping ditambahkan di belakang
+    base_names = pd.Series(index.names if index is not None else [], dtype=object)
+    extra = pd.concat([rel_children, rel_parents, report_jobs], ignore_index=True)
+    job_names = pd.unique(pd.concat([base_names, extra[extra != ""]], ignore_index=True))
+    job_id = pd.Series(np.arange(len(job_names), dtype=np.int32), index=job_names)
+
+    edges = pd.concat([
+        pd.DataFrame({
+            "src": index.src if index is not None else np.empty(0, dtype=np.int32),
+            "dst": index.dst if index is not None else np.empty(0, dtype=np.int32),
+        }),
+        pd.DataFrame({"src": rel_parents.map(job_id), "dst": rel_children.map(job_id)}).dropna(),
+    ], ignore_index=True)
+    edges = edges[edges["src"] != edges["dst"]].astype(np.int32).drop_duplicates()
+
+    # Controller pertama per job: baris pertama job itu; controller kosong = tidak punya parent
+    parent = np.full(len(job_names), -1, dtype=np.int32)
+    first = (rel_children != "") & ~rel_children.duplicated()
+    has_parent = first & (rel_parents != "")
+    parent[rel_children[has_parent].map(job_id).to_numpy(dtype=np.int64)] = (
+        rel_parents[has_parent].map(job_id).to_numpy(dtype=np.int32)
+    )
+
+    report_codes, report_uniques = pd.factorize(report_names)
+    links = pd.DataFrame({
+        "report": report_codes.astype(np.int32),
+        "job": report_jobs.map(job_id).to_numpy(dtype=np.int32),
+    }).drop_duplicates()
+
+    return LineageGraph(
+        job_names, edges["src"].to_numpy(), edges["dst"].to_numpy(),
+        list(report_uniques), links["report"].to_numpy(), links["job"].to_numpy(), parent,
+    )
+
+
+def lineage_frame(graph, targets):
+    # target_job, Level_1..Level_n, Root_Job, Level_Count (format sheet job_hierarchy_result)
+    targets = [str(target).strip() for target in targets]
+    paths = graph.controller_paths(targets)
+    levels = pd.DataFrame([list(path) for path in paths], dtype=object)
+    levels.columns = [f"Level_{i + 1}" for i in range(levels.shape[1])]
+    result = pd.concat([pd.DataFrame({"target_job": targets}), levels], axis=1)
+    result["Root_Job"] = [path[-1] for path in paths]
+    result["Level_Count"] = [len(path) for path in paths]
+    return result
+
+
+def report_job_status(df_report, df_active):
+    # Satu baris per pasangan report-job (sel matched_jobs*), status Active jika job ada di
+    # daftar job_name sheet Job_run_time
+    reports, jobs = _report_pairs(df_report)
+    active = _clean_names(_lower_columns(df_active)["job_name"])
+    status = np.where(jobs.isin(active[active != ""].unique()), "Active", "Inactive")
+    return pd.DataFrame({"report_name": reports.to_numpy(), "job_name": jobs.to_numpy(), "status": status})
+
+
+def read_mapping(mapping_path):
+    sheets = pd.read_excel(mapping_path, sheet_name=[RELATIONSHIP_SHEET, REPORT_SHEET])
+    return sheets[RELATIONSHIP_SHEET], sheets[REPORT_SHEET]
+
+
+# ====================================================================
+# Cache .npz: valid selama kedua workbook tidak berubah (mtime+size, lalu hash)
+# ====================================================================
+
+def _cache_path(hierarchy_path, mapping_path, cache_dir):
+    name = f"lineage_{os.path.basename(hierarchy_path)}_{os.path.basename(mapping_path)}.npz"
+    return os.path.join(cache_dir, name)
+
+
+def _write_cache(cache_path, graph, stats, digests):
+    write_npz_cache(
+        cache_path,
+        CACHE_VERSION,
+        source_mtime_ns=np.array([stat.st_mtime_ns for stat in stats], dtype=np.int64),
+        source_size=np.array([stat.st_size for stat in stats], dtype=np.int64),
+        source_hash=np.array(digests, dtype=str),
+        job_names=np.array(graph.job_names, dtype=str),
+        src=graph.src,
+        dst=graph.dst,
+        report_names=np.array(graph.report_names, dtype=str),
+        link_report=graph.link_report,
+        link_job=graph.link_job,
+        parent=graph.parent,
+    )
+
+
+def _graph_from_cache(cached):
+    return LineageGraph(
+        cached["job_names"].tolist(),
+        cached["src"],
+        cached["dst"],
+        cached["report_names"].tolist(),
+        cached["link_report"],
+        cached["link_job"],
+        cached["parent"],
+    )
+
+
+def load_lineage(hierarchy_path=HIERARCHY_FILE, mapping_path=MAPPING_FILE, cache_dir=CACHE_DIR, index=None):
+    # index: JobGraphIndex hierarchy_path yang sudah dimuat (mis. oleh viewer); jika None
+    # dimuat lewat load_job_graph_index (cache .npz sendiri)
+    paths = (hierarchy_path, mapping_path)
+    stats = [os.stat(path) for path in paths]
+    cache_path = _cache_path(hierarchy_path, mapping_path, cache_dir)
+    cached = read_npz_cache(cache_path, CACHE_VERSION)
+
+    if (
+        cached is not None
+        and cached["source_mtime_ns"].tolist() == [stat.st_mtime_ns for stat in stats]
+        and cached["source_size"].tolist() == [stat.st_size for stat in stats]
+    ):
+        return _graph_from_cache(cached)
+
+    digests = [file_digest(path) for path in paths]
+    if cached is not None and cached["source_hash"].tolist() == digests:
+        # Isi sama (mis. file hanya di-copy ulang): cukup perbarui mtime di cache
+        graph = _graph_from_cache(cached)
+    else:
+        if index is None:
+            index = load_job_graph_index(hierarchy_path, cache_dir)
+        graph = build_lineage(index, *read_mapping(mapping_path))
+
+    _write_cache(cache_path, graph, stats, digests)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lineage job -> report (job_hirarki + report_to_job_mapping)")
+    parser.add_argument("--hierarchy", default=HIERARCHY_FILE)
+    parser.add_argument("--mapping", default=MAPPING_FILE)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    reports_parser = sub.add_parser("reports", help="report yang bergantung pada job")
+    reports_parser.add_argument("job")
+    jobs_parser = sub.add_parser("jobs", help="job yang mengisi report")
+    jobs_parser.add_argument("report")
+    args = parser.parse_args()
+
+    graph = load_lineage(args.hierarchy, args.mapping, args.cache_dir)
+    if args.command == "reports":
+        names = graph.reports_for_job(args.job)
+    else:
+        if not graph.has_report(args.report):
+            parser.error(f"Report tidak ditemukan: {args.report}")
+        names = graph.jobs_for_report(args.report)
+    print("\n".join(names))
+    print(f"-- {len(names)} {'report' if args.command == 'reports' else 'job'}")
+
+
+if __name__ == "__main__":
+    main()
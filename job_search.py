@@ -0,0 +1,96 @@
+import bisect
+import re
+
+import numpy as np
+
+# Scorer C (rapidfuzz) jika tersedia; fallback ke fuzzywuzzy yang dipakai sebelumnya
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    from fuzzywuzzy import process
+
+_NON_ALNUM = re.compile(r"(?ui)\W")
+_TOKEN_SEP = re.compile(r"[\s_]+")
+
+
+def normalize(text):
+    # Sama dengan fuzzywuzzy full_process: non-alfanumerik -> spasi, lowercase, strip
+    return _NON_ALNUM.sub(" ", str(text)).lower().strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class JobSearchIndex:
+    # Index pencarian job: inverted index trigram + prefix (sorted array + bisect,
+    # setara trie) untuk shortlist, lalu WRatio hanya dihitung di shortlist.
+    def __init__(self, names, max_candidates=500):
+        self.names = list(names)
+        self.processed = [normalize(name) for name in self.names]
+        self.max_candidates = max_candidates
+
+        postings = {}
+        for i, text in enumerate(self.processed):
+            for gram in trigrams(text):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+        # Prefix lookup untuk nama utuh dan tiap token (mis. "daily" di "job_mis_daily")
+        keys = []
+        for i, text in enumerate(self.processed):
+            keys.append((text, i))
+            keys.extend((token, i) for token in _TOKEN_SEP.split(text)[1:] if token)
+        keys.sort()
+        self._prefix_keys = [key for key, _ in keys]
+        self._prefix_ids = [i for _, i in keys]
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix_ids(self, prefix, limit=None):
+        lo = bisect.bisect_left(self._prefix_keys, prefix)
+        hi = bisect.bisect_left(self._prefix_keys, prefix + "\uffff")
+        ids = self._prefix_ids[lo:hi]
+        return ids if limit is None else ids[:limit]
+
+    def candidates(self, query):
+        grams = [gram for gram in trigrams(query) if gram in self.postings]
+        if grams:
+            counts = np.bincount(
+                np.concatenate([self.postings[gram] for gram in grams]), minlength=len(self.names)
+            )
+            ids = np.flatnonzero(counts)
+            if len(ids) > self.max_candidates:
+                top = np.argpartition(counts[ids], -self.max_candidates)[-self.max_candidates:]
+                ids = ids[top]
+        else:
+            ids = np.empty(0, dtype=np.int64)
+
+        prefix = self.prefix_ids(query, limit=self.max_candidates)
+        if prefix:
+            ids = np.union1d(ids, prefix)
+        # Urut id supaya tie-break skor sama dengan scan penuh di all_job_names
+        return np.unique(ids).tolist()
+
+    def search(self, query, limit=10, threshold=70):
+        # Hasil: [(nama_job, skor)] maksimal `limit`, skor >= threshold, skor tertinggi dulu
+        query = normalize(query)
+        if not query:
+            return []
+
+        ids = self.candidates(query)
+        if not ids:
+            return []
+        choices = [self.processed[i] for i in ids]
+
+        if fuzz is not None:
+            matches = process.extract(
+                query, choices, scorer=fuzz.WRatio, processor=None, limit=limit, score_cutoff=threshold
+            )
+            return [(self.names[ids[pos]], round(score)) for _, score, pos in matches]
+
+        matches = process.extract(query, dict(enumerate(choices)), limit=limit)
+        return [(self.names[ids[pos]], score) for _, score, pos in matches if score >= threshold]
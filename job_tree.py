@@ -0,0 +1,66 @@
+# Lazy tree provider untuk streamlit_tree_select.
+# Hanya node yang sedang di-expand yang anak-anaknya dibangun; folder yang masih
+# tertutup mendapat satu placeholder supaya ikon expand tetap muncul. Job yang
+# muncul di beberapa cabang (diamond) hanya di-expand sekali, kemunculan berikutnya
+# menjadi node referensi tanpa anak.
+
+REF_SEP = "::ref::"
+MORE_SUFFIX = "::more"
+
+
+def tree_value_to_job(value):
+    # Ubah value node tree kembali ke nama job (None untuk placeholder)
+    if value is None or value.endswith(MORE_SUFFIX):
+        return None
+    return value.split(REF_SEP, 1)[0]
+
+
+def tree_values_to_jobs(values):
+    jobs = []
+    for value in values or []:
+        job = tree_value_to_job(value)
+        if job is not None and job not in jobs:
+            jobs.append(job)
+    return jobs
+
+
+def build_lazy_tree(index, root, expanded, label_fn, sort_children=False):
+    # label_fn(job, n_children) -> label node; iteratif, tanpa rekursi
+    expanded = set(expanded or [])
+    emitted = {}
+
+    def make_node(job):
+        children = index.successors(job)
+        if sort_children:
+            children = sorted(children)
+
+        n_seen = emitted.get(job, 0)
+        emitted[job] = n_seen + 1
+        if n_seen:
+            # Subtree job ini sudah ada di tempat lain: tampilkan referensi saja
+            node = {"label": f"↪ {label_fn(job, len(children))}", "value": f"{job}{REF_SEP}{n_seen}"}
+            return node, []
+
+        node = {"label": label_fn(job, len(children)), "value": job}
+        if not children:
+            return node, []
+        if job not in expanded:
+            node["children"] = [{"label": "…", "value": f"{job}{MORE_SUFFIX}"}]
+            return node, []
+        node["children"] = []
+        return node, children
+
+    root_node, root_children = make_node(root)
+    stack = [(root_node, root_children)]
+    while stack:
+        node, children = stack.pop()
+        pending = []
+        for child in children:
+            child_node, grandchildren = make_node(child)
+            node["children"].append(child_node)
+            if grandchildren:
+                pending.append((child_node, grandchildren))
+        # reversed supaya urutan expand mengikuti urutan sibling (DFS kiri ke kanan)
+        stack.extend(reversed(pending))
+
+    return root_node
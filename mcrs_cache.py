@@ -0,0 +1,166 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mcrs_index import ReportSearchIndex
+from mcrs_search import GROUP_COLUMNS, fetch_all, fetch_changed
+
+# Umur snapshot (detik) sebelum refresh di background dipicu
+DEFAULT_TTL = 300
+
+# Refresh inkremental tidak melihat baris yang dihapus; reload penuh sesekali
+FULL_REFRESH_INTERVAL = 6 * 3600
+
+# Kolom yang berubah setiap kali baris berubah (dipakai sebagai watermark refresh)
+WATERMARK_COLUMN = "last_login_date"
+
+
+class CatalogSnapshot:
+    # Data MCRS + index pencarian pada satu titik waktu. Tidak pernah diubah setelah
+    # dibuat; refresh membuat snapshot baru lalu menukar referensinya.
+    def __init__(self, df, index, watermark, loaded_at, full_loaded_at):
+        self.df = df
+        self.index = index
+        self.watermark = watermark
+        self.loaded_at = loaded_at
+        self.full_loaded_at = full_loaded_at
+
+    @property
+    def age(self):
+        return time.time() - self.loaded_at
+
+
+class CacheMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.full_refreshes = 0
+        self.failures = 0
+        self.last_refresh_seconds = None
+        self.last_delta_rows = None
+        self.last_error = None
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _max_value(df, column):
+    values = df[column].dropna()
+    return values.max() if len(values) else None
+
+
+def _group_index(df):
+    # Sama dengan COALESCE(CAST(.. AS TEXT), '') di mcrs_search
+    return pd.MultiIndex.from_frame(df[list(GROUP_COLUMNS)].fillna("").astype(str))
+
+
+def merge_changed(df, changed):
+    # Ganti grup GROUP_COLUMNS yang berubah: semua baris lama grup itu dibuang, baris baru
+    # (grup utuh dari fetch_changed, unik per GROUP_COLUMNS + row_seq) ditambahkan di akhir.
+    # Return (df baru, mask baris lama yang dipertahankan).
+    if changed.empty:
+        return df, np.ones(len(df), dtype=bool)
+    keep = np.asarray(~_group_index(df).isin(_group_index(changed)))
+    return pd.concat([df[keep], changed], ignore_index=True), keep
+
+
+class CatalogCache:
+    # Cache katalog MCRS dengan TTL. Pembaca selalu mendapat snapshot yang sudah siap
+    # (stale-while-revalidate); hanya load pertama yang menunggu database.
+    def __init__(self, engine, ttl=DEFAULT_TTL, full_refresh_interval=FULL_REFRESH_INTERVAL,
+                 watermark_column=WATERMARK_COLUMN):
+        self.engine = engine
+        self.ttl = ttl
+        self.full_refresh_interval = full_refresh_interval
+        self.watermark_column = watermark_column
+        self.metrics = CacheMetrics()
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _snapshot_from(self, df, full_loaded_at):
+        now = time.time()
+        return CatalogSnapshot(
+            df, ReportSearchIndex(df), _max_value(df, self.watermark_column), now, full_loaded_at or now
+        )
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    self.metrics.misses += 1
+                    self._refresh_locked(full=True)
+                    return self._snapshot
+        if snapshot.age < self.ttl:
+            self.metrics.hits += 1
+        else:
+            self.metrics.stale_hits += 1
+            self.refresh_async()
+        return snapshot
+
+    def refresh_async(self, full=False):
+        # Paling banyak satu refresh berjalan; return False jika sudah ada yang berjalan
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+
+        def work():
+            try:
+                with self._lock:
+                    self._refresh_locked(full)
+            except Exception:
+                pass  # sudah dicatat di metrics; snapshot lama tetap dipakai
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=work, daemon=True).start()
+        return True
+
+    def refresh(self, full=False):
+        with self._lock:
+            self._refresh_locked(full)
+        return self._snapshot
+
+    def _refresh_locked(self, full):
+        # Dipanggil dengan self._lock dipegang: get() hanya membaca self._snapshot tanpa lock,
+        # jadi pembaca tidak pernah menunggu refresh.
+        start = time.perf_counter()
+        snapshot = self._snapshot
+        try:
+            if (full or snapshot is None or snapshot.watermark is None
+                    or time.time() - snapshot.full_loaded_at >= self.full_refresh_interval):
+                df = fetch_all(self.engine)
+                new_snapshot = self._snapshot_from(df, None)
+                self.metrics.full_refreshes += 1
+                self.metrics.last_delta_rows = len(df)
+            else:
+                changed = fetch_changed(self.engine, self.watermark_column, snapshot.watermark)
+                if changed.empty:
+                    new_snapshot = CatalogSnapshot(
+                        snapshot.df, snapshot.index, snapshot.watermark, time.time(), snapshot.full_loaded_at
+                    )
+                else:
+                    # Index diperbarui hanya untuk baris yang dibuang / ditambahkan
+                    df, keep = merge_changed(snapshot.df, changed)
+                    new_snapshot = CatalogSnapshot(
+                        df, snapshot.index.updated(keep, changed), _max_value(df, self.watermark_column),
+                        time.time(), snapshot.full_loaded_at,
+                    )
+                self.metrics.last_delta_rows = len(changed)
+            # Pertukaran atomik: satu assignment referensi
+            self._snapshot = new_snapshot
+            self.metrics.refreshes += 1
+            self.metrics.last_error = None
+        except Exception as e:
+            self.metrics.failures += 1
+            self.metrics.last_error = str(e)
+            raise
+        finally:
+            self.metrics.last_refresh_seconds = round(time.perf_counter() - start, 3)
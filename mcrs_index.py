@@ -0,0 +1,214 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+from mcrs_search import CHOICE_COLUMNS, NAME_COLUMNS, SEARCH_COLUMNS
+
+# Bobot kolom untuk ranking hasil pencarian bebas
+FIELD_WEIGHTS = {"report_name": 4, "report_code": 3, "report_owner_name": 2, "report_description": 1}
+
+# Skor per term: token sama persis > awalan token > substring di tengah
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+_TOKEN_SEP = re.compile(r"[^\w]+|_")
+
+
+def tokenize(text):
+    return [token for token in _TOKEN_SEP.split(text) if token]
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _normalize(values):
+    return pd.Series(values, dtype=object).fillna("").astype(str).str.lower()
+
+
+class _ColumnIndex:
+    # Index satu kolom teks. Baris di-factorize ke nilai unik (report_name dsb. berulang
+    # per user), postings token/trigram dibangun atas nilai unik, lalu hasil dipetakan
+    # ke baris lewat `codes`.
+    def __init__(self, values):
+        codes, uniques = pd.factorize(_normalize(values))
+        self.codes = codes.astype(np.int32)
+        self.uniques = list(uniques)
+        self._unique_ids = {text: i for i, text in enumerate(self.uniques)}
+
+        grams, tokens = self._postings(0)
+        self.grams = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in grams.items()}
+        tokens.sort()
+        self._token_keys = [token for token, _ in tokens]
+        self._token_ids = np.asarray([i for _, i in tokens], dtype=np.int32)
+
+    def _postings(self, start):
+        # Postings trigram + token untuk nilai unik mulai dari id `start`
+        grams = {}
+        tokens = []
+        for i in range(start, len(self.uniques)):
+            text = self.uniques[i]
+            for gram in trigrams(text):
+                grams.setdefault(gram, []).append(i)
+            tokens.extend((token, i) for token in set(tokenize(text)))
+        return grams, tokens
+
+    def updated(self, keep, values):
+        # Index baru = baris lama dengan mask `keep` + baris `values` di akhir. Hanya nilai unik
+        # yang belum pernah ada yang ditokenisasi; nilai yang tidak lagi dipakai baris mana pun
+        # tetap di postings (tidak pernah cocok ke baris) sampai reload penuh.
+        new = object.__new__(_ColumnIndex)
+        new.uniques = list(self.uniques)
+        new._unique_ids = dict(self._unique_ids)
+        start = len(new.uniques)
+        added_codes = np.empty(len(values), dtype=np.int32)
+        for row, text in enumerate(_normalize(values)):
+            i = new._unique_ids.get(text)
+            if i is None:
+                i = new._unique_ids[text] = len(new.uniques)
+                new.uniques.append(text)
+            added_codes[row] = i
+        new.codes = np.concatenate([self.codes[keep], added_codes])
+
+        grams, tokens = new._postings(start)
+        new.grams = dict(self.grams)
+        for gram, ids in grams.items():
+            # id baru selalu lebih besar, jadi postings tetap terurut
+            old = new.grams.get(gram)
+            ids = np.asarray(ids, dtype=np.int32)
+            new.grams[gram] = ids if old is None else np.concatenate([old, ids])
+        if tokens:
+            tokens.sort()
+            keys = [token for token, _ in tokens]
+            positions = [bisect.bisect_right(self._token_keys, key) for key in keys]
+            new._token_keys = np.insert(np.asarray(self._token_keys, dtype=object), positions, keys).tolist()
+            new._token_ids = np.insert(self._token_ids, positions, [i for _, i in tokens]).astype(np.int32)
+        else:
+            new._token_keys = self._token_keys
+            new._token_ids = self._token_ids
+        return new
+
+    def prefix_ids(self, term):
+        lo = bisect.bisect_left(self._token_keys, term)
+        hi = bisect.bisect_left(self._token_keys, term + "\uffff")
+        return self._token_ids[lo:hi], self._token_keys[lo:hi]
+
+    def substring_ids(self, term):
+        if len(term) >= 3:
+            postings = [self.grams.get(gram) for gram in trigrams(term)]
+            if any(ids is None for ids in postings):
+                return np.empty(0, dtype=np.int32)
+            postings.sort(key=len)
+            candidates = postings[0]
+            for ids in postings[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        else:
+            candidates = range(len(self.uniques))
+        # Trigram hanya menyaring kandidat; substring tetap diverifikasi
+        return np.asarray([i for i in candidates if term in self.uniques[i]], dtype=np.int32)
+
+    def term_scores(self, term):
+        # Skor per nilai unik (0 = tidak cocok)
+        scores = np.zeros(len(self.uniques), dtype=np.int8)
+        scores[self.substring_ids(term)] = SUBSTRING
+        ids, keys = self.prefix_ids(term)
+        if len(ids):
+            scores[ids] = PREFIX
+            exact = [k == term for k in keys]
+            scores[ids[np.asarray(exact, dtype=bool)]] = EXACT
+        return scores
+
+
+class ReportSearchIndex:
+    # Index pencarian MCRS di memori, dibangun sekali per load data:
+    # - kolom teks: postings token (awalan via sorted list + bisect) dan trigram (substring)
+    # - kolom dropdown: mask boolean per nilai, di-AND dengan hasil teks
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.columns = {
+            column: _ColumnIndex(self.df[column].tolist())
+            for column in dict.fromkeys(SEARCH_COLUMNS + NAME_COLUMNS)
+        }
+        self.masks = {}
+        for column in CHOICE_COLUMNS:
+            codes, uniques = pd.factorize(self.df[column])
+            self.masks[column] = {value: codes == i for i, value in enumerate(uniques)}
+
+    def __len__(self):
+        return len(self.df)
+
+    def updated(self, keep, added):
+        # Index untuk df[keep] + added (refresh inkremental); index ini sendiri tidak diubah
+        new = object.__new__(ReportSearchIndex)
+        new.df = pd.concat([self.df[keep], added], ignore_index=True)
+        new.columns = {
+            column: index.updated(keep, added[column].tolist()) for column, index in self.columns.items()
+        }
+        new.masks = {}
+        for column, masks in self.masks.items():
+            codes, uniques = pd.factorize(added[column])
+            added_ids = {value: i for i, value in enumerate(uniques)}
+            column_masks = {}
+            for value in dict.fromkeys(list(masks) + list(uniques)):
+                old = masks[value][keep] if value in masks else np.zeros(int(np.count_nonzero(keep)), dtype=bool)
+                mask = np.concatenate([old, codes == added_ids[value] if value in added_ids else
+                                       np.zeros(len(added), dtype=bool)])
+                if mask.any():
+                    column_masks[value] = mask
+            new.masks[column] = column_masks
+        return new
+
+    def choices(self, column):
+        return sorted(self.masks[column])
+
+    def choice_mask(self, choices=None):
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, value in (choices or {}).items():
+            if value is None or value == "All":
+                continue
+            value_mask = self.masks[column].get(value)
+            if value_mask is None:
+                return np.zeros(len(self.df), dtype=bool)
+            mask &= value_mask
+        return mask
+
+    def text_scores(self, text, columns):
+        # Term = kata yang dipisah spasi. Semua term harus cocok (AND) sebagai substring
+        # di salah satu kolom (OR).
+        # Skor baris = jumlah skor terbaik tiap term x bobot kolom. None jika teks kosong.
+        terms = list(dict.fromkeys(text.lower().split()))
+        if not terms:
+            return None
+        total = np.zeros(len(self.df), dtype=np.int32)
+        matched = np.ones(len(self.df), dtype=bool)
+        for term in terms:
+            best = np.zeros(len(self.df), dtype=np.int32)
+            for column in columns:
+                index = self.columns[column]
+                scores = index.term_scores(term)
+                if scores.any():
+                    np.maximum(best, scores[index.codes].astype(np.int32) * FIELD_WEIGHTS.get(column, 1), out=best)
+            matched &= best > 0
+            if not matched.any():
+                break
+            total += best
+        total[~matched] = 0
+        return total
+
+    def search(self, search="", report_name="", choices=None):
+        # Posisi baris yang cocok; ada teks -> urut skor tertinggi, tanpa teks -> urutan asli
+        mask = self.choice_mask(choices)
+        score = None
+        for text, columns in ((search, SEARCH_COLUMNS), (report_name, NAME_COLUMNS)):
+            text_score = self.text_scores(text or "", columns)
+            if text_score is not None:
+                mask &= text_score > 0
+                score = text_score if score is None else score + text_score
+        ids = np.flatnonzero(mask)
+        if score is not None:
+            ids = ids[np.argsort(-score[ids], kind="stable")]
+        return ids
+
+    def page(self, ids, offset=0, page_size=100):
+        return self.df.iloc[ids[offset:offset + page_size]]
@@ -0,0 +1,215 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import psycopg2
+
+from db_pool import like_pattern
+
+# Query layer untuk Report_Search_MCRS.py: filter sidebar diterjemahkan ke SQL
+# berparameter (COUNT + halaman LIMIT dengan keyset), jadi app tidak pernah
+# memuat seluruh hasil join ke pandas.
+
+PAGE_SIZE = 100
+
+REPORT_QUERY = """
+SELECT
+    a.emp_id,
+    b.report_code,
+    b.report_name,
+    b.report_description,
+    b.report_extension,
+    b.document_pathkey,
+    b.report_owner_name,
+    c.status as status_employee,
+    a.status_login,
+    a.last_login_date,
+    a.level_name,
+    a.group_name,
+    b.div_code,
+    b.div_name,
+    a.title
+FROM
+    v_user_info a
+LEFT JOIN
+    v_report_item b
+ON
+    a.emp_id = b.report_owner_nik
+join
+    t_dim_user_employee_vito c
+on
+    b.report_owner_nik = CAST(c.nik as TEXT)
+"""
+
+RESULT_COLUMNS = [
+    "emp_id", "report_code", "report_name", "report_description", "report_extension", "document_pathkey",
+    "report_owner_name", "status_employee", "status_login", "last_login_date", "level_name", "group_name",
+    "div_code", "div_name", "title",
+]
+
+# Kolom untuk pencarian bebas dan untuk filter nama/kode report (substring, case-insensitive)
+SEARCH_COLUMNS = ("report_name", "report_code", "report_owner_name", "report_description")
+NAME_COLUMNS = ("report_name", "report_code")
+
+# Kolom dropdown (filter sama dengan)
+CHOICE_COLUMNS = ("group_name", "report_extension", "status_employee")
+
+# Urutan halaman. Kombinasi ini tidak unik (baris join bisa sama persis di kolom ini), jadi
+# tiap baris diberi nomor urut dalam grupnya (ROW_SEQ_COLUMN, urut semua kolom lain);
+# GROUP_COLUMNS + nomor urut = key unik yang dipakai sebagai keyset "halaman berikutnya".
+GROUP_COLUMNS = ("report_code", "emp_id", "document_pathkey")
+ROW_SEQ_COLUMN = "row_seq"
+KEY_COLUMNS = GROUP_COLUMNS + (ROW_SEQ_COLUMN,)
+
+
+def pg_connect(config):
+    # Koneksi autocommit: SELECT tidak meninggalkan transaksi terbuka selama koneksi idle di pool
+    conn = psycopg2.connect(**config)
+    conn.autocommit = True
+    return conn
+
+
+class PostgresEngine:
+    # Query ke PostgreSQL MCRS lewat pool koneksi (db_pool.ConnectionPool)
+    placeholder = "%s"
+    like = "ILIKE"
+
+    def __init__(self, pool):
+        self._pool = pool
+        self.source = f"({numbered_source(f'({REPORT_QUERY}) mcrs_join')}) mcrs"
+
+    def query(self, sql, params=()):
+        with self._pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [desc[0] for desc in cursor.description]
+                rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+
+class SQLiteEngine:
+    # Engine lokal di memori dengan kolom yang sama, untuk tes / pengembangan tanpa database live
+    placeholder = "?"
+    like = "LIKE"
+
+    def __init__(self, conn, table="mcrs_reports"):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.source = f"({numbered_source(table)}) mcrs"
+
+    @classmethod
+    def from_frame(cls, df, table="mcrs_reports"):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        # LIKE di SQLite hanya case-insensitive untuk ASCII; cukup untuk data MCRS
+        df.reindex(columns=RESULT_COLUMNS).to_sql(table, conn, index=False)
+        return cls(conn, table)
+
+    def query(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+
+def _key_expr(column):
+    if column == ROW_SEQ_COLUMN:
+        return column
+    return f"COALESCE(CAST({column} AS TEXT), '')"
+
+
+def numbered_source(source):
+    # Tambah ROW_SEQ_COLUMN: nomor baris per GROUP_COLUMNS, urut semua kolom lain. Hasilnya
+    # sama di setiap query; hanya baris yang identik di semua kolom yang bisa bertukar nomor.
+    group_sql = ", ".join(_key_expr(column) for column in GROUP_COLUMNS)
+    order_sql = ", ".join(column for column in RESULT_COLUMNS if column not in GROUP_COLUMNS)
+    return (
+        f"SELECT {', '.join(RESULT_COLUMNS)}, "
+        f"ROW_NUMBER() OVER (PARTITION BY {group_sql} ORDER BY {order_sql}) AS {ROW_SEQ_COLUMN} "
+        f"FROM {source}"
+    )
+
+
+def _select_columns():
+    return ", ".join(RESULT_COLUMNS + [ROW_SEQ_COLUMN])
+
+
+def build_where(engine, search="", report_name="", choices=None):
+    # choices: {kolom: nilai} untuk kolom di CHOICE_COLUMNS; nilai None / "All" diabaikan
+    clauses = []
+    params = []
+    p = engine.placeholder
+
+    for text, columns in ((search, SEARCH_COLUMNS), (report_name, NAME_COLUMNS)):
+        text = (text or "").strip()
+        if text:
+            clauses.append("(" + " OR ".join(f"{column} {engine.like} {p} ESCAPE '\\'" for column in columns) + ")")
+            params.extend([like_pattern(text)] * len(columns))
+
+    for column, value in (choices or {}).items():
+        if column not in CHOICE_COLUMNS:
+            raise ValueError(f"Kolom filter tidak dikenal: {column}")
+        if value is not None and value != "All":
+            clauses.append(f"{column} = {p}")
+            params.append(value)
+
+    where = " AND ".join(clauses) if clauses else "1=1"
+    return where, params
+
+
+def count_reports(engine, search="", report_name="", choices=None):
+    where, params = build_where(engine, search, report_name, choices)
+    df = engine.query(f"SELECT COUNT(*) AS n FROM {engine.source} WHERE {where}", params)
+    return int(df.iloc[0, 0])
+
+
+def fetch_page(engine, search="", report_name="", choices=None, page_size=PAGE_SIZE, after=None):
+    # Satu halaman hasil (RESULT_COLUMNS + ROW_SEQ_COLUMN), urut KEY_COLUMNS.
+    # after: page_key() dari halaman sebelumnya.
+    where, params = build_where(engine, search, report_name, choices)
+    key_sql = ", ".join(_key_expr(column) for column in KEY_COLUMNS)
+    if after is not None:
+        where += f" AND ({key_sql}) > ({', '.join([engine.placeholder] * len(KEY_COLUMNS))})"
+        params = params + list(after)
+    sql = (
+        f"SELECT {_select_columns()} FROM {engine.source} WHERE {where} "
+        f"ORDER BY {key_sql} LIMIT {int(page_size)}"
+    )
+    return engine.query(sql, params)
+
+
+def page_key(page):
+    # Keyset dari baris terakhir halaman, untuk parameter `after` halaman berikutnya
+    if page.empty:
+        return None
+    last = page.iloc[-1]
+    key = tuple("" if pd.isna(last[column]) else str(last[column]) for column in GROUP_COLUMNS)
+    return key + (int(last[ROW_SEQ_COLUMN]),)
+
+
+def distinct_values(engine, column):
+    # Pilihan dropdown sidebar, diambil dengan SELECT DISTINCT (bukan dari DataFrame penuh)
+    if column not in CHOICE_COLUMNS:
+        raise ValueError(f"Kolom filter tidak dikenal: {column}")
+    df = engine.query(
+        f"SELECT DISTINCT {column} FROM {engine.source} WHERE {column} IS NOT NULL ORDER BY {column}"
+    )
+    return df[column].tolist()
+
+
+def fetch_all(engine):
+    # Seluruh hasil join, untuk membangun index di memori (mode "index" di app)
+    return engine.query(f"SELECT {_select_columns()} FROM {engine.source}")
+
+
+def fetch_changed(engine, column, since):
+    # Semua baris dari grup GROUP_COLUMNS yang punya baris dengan `column` > since (watermark
+    # refresh inkremental). Satu grup diambil utuh karena nomor row_seq di dalamnya bisa bergeser.
+    if column not in RESULT_COLUMNS:
+        raise ValueError(f"Kolom watermark tidak dikenal: {column}")
+    group_sql = ", ".join(_key_expr(key) for key in GROUP_COLUMNS)
+    return engine.query(
+        f"SELECT {_select_columns()} FROM {engine.source} WHERE ({group_sql}) IN "
+        f"(SELECT {group_sql} FROM {engine.source} WHERE {column} > {engine.placeholder})",
+        [since]
+    )
@@ -0,0 +1,177 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import dateparser
+import pandas as pd
+import requests
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limit import RateLimiter
+
+# Pengumpul berita SerpAPI (Google News) untuk Search_news.ipynb:
+# - banyak keyword x halaman diambil paralel lewat satu requests.Session (connection pool),
+#   dengan batas request per detik dan retry otomatis untuk 429/5xx
+# - tanggal relatif ("2 jam lalu") diparse sekali per string unik
+# - artikel di-dedupe per hash link, lalu di-upsert (ON CONFLICT DO NOTHING) sehingga
+#   run ulang hanya menulis artikel baru
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Jumlah hasil per halaman SerpAPI tbm=nws (parameter start = halaman x PAGE_SIZE)
+PAGE_SIZE = 10
+
+ARTICLE_COLUMNS = ["title", "source", "date", "link", "snippet", "query", "parsed_date", "link_hash"]
+
+DATE_SETTINGS = {"PREFER_DATES_FROM": "past", "TIMEZONE": "Asia/Jakarta"}
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+INSERT_PAGE_SIZE = 500
+
+
+def make_session(pool_size=4, retries=3, backoff=0.5):
+    # Koneksi HTTP dipakai ulang antar request; retry menghormati header Retry-After
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def link_hash(link):
+    # Sama dengan md5(btrim(link)) di PostgreSQL (dipakai saat backfill di ensure_table)
+    return hashlib.md5(str(link).strip().encode("utf-8")).hexdigest()
+
+
+def parse_dates(values):
+    # dateparser lambat dan string tanggal banyak berulang ("1 hari lalu"), jadi tiap
+    # string unik diparse sekali lalu dipetakan balik ke semua baris
+    values = pd.Series(values, dtype=object)
+    parsed = {
+        value: dateparser.parse(value, settings=DATE_SETTINGS)
+        for value in values.dropna().unique()
+    }
+    return pd.to_datetime(values.map(parsed))
+
+
+class NewsCollector:
+    def __init__(self, api_key, base_url=SERPAPI_URL, workers=4, rate_per_second=5,
+                 retries=3, backoff=0.5, timeout=30, session=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.workers = workers
+        self.timeout = timeout
+        self.session = session or make_session(pool_size=workers, retries=retries, backoff=backoff)
+        self.limiter = RateLimiter(rate_per_second)
+        self.failures = []
+
+    def fetch_page(self, query, page=0):
+        # List artikel (dict) satu halaman hasil untuk satu keyword
+        params = {"q": query, "tbm": "nws", "hl": "id", "gl": "id", "api_key": self.api_key}
+        if page:
+            params["start"] = page * PAGE_SIZE
+        self.limiter.wait()
+        res = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        res.raise_for_status()
+        return [
+            {
+                "title": a.get("title"),
+                "source": a.get("source"),
+                "date": a.get("date"),
+                "link": a.get("link"),
+                "snippet": a.get("snippet"),
+                "query": query,
+            }
+            for a in res.json().get("news_results", [])
+        ]
+
+    def _fetch_safe(self, task):
+        query, page = task
+        try:
+            return self.fetch_page(query, page)
+        except (requests.RequestException, ValueError) as e:
+            self.failures.append((query, page, str(e)))
+            return []
+
+    def collect(self, keywords, pages=1):
+        # Halaman diambil per putaran: halaman berikutnya hanya untuk keyword yang
+        # halaman sebelumnya penuh. Keyword/halaman yang gagal dicatat di self.failures.
+        self.failures = []
+        keywords = list(dict.fromkeys(kw.strip() for kw in keywords if kw and kw.strip()))
+        articles = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            active = keywords
+            for page in range(pages):
+                if not active:
+                    break
+                results = list(pool.map(self._fetch_safe, [(kw, page) for kw in active]))
+                for rows in results:
+                    articles.extend(rows)
+                active = [kw for kw, rows in zip(active, results) if len(rows) >= PAGE_SIZE]
+        return articles_frame(articles)
+
+
+def articles_frame(articles):
+    # DataFrame ARTICLE_COLUMNS; artikel dengan link sama (mis. muncul di beberapa keyword)
+    # hanya disimpan sekali, keyword pertama yang dipakai
+    df = pd.DataFrame(articles, columns=ARTICLE_COLUMNS[:6])
+    df = df[df["link"].notna()]
+    df["link_hash"] = df["link"].map(link_hash)
+    df = df.drop_duplicates("link_hash", ignore_index=True)
+    df["parsed_date"] = parse_dates(df["date"])
+    return df[ARTICLE_COLUMNS]
+
+
+def ensure_table(conn, table):
+    # Tabel lama (dibuat to_sql) tetap dipakai: kolom link_hash ditambahkan, diisi untuk
+    # satu baris per link, lalu dipasang unique index sebagai target ON CONFLICT
+    ident = sql.Identifier(table)
+    statements = [
+        sql.SQL(
+            "CREATE TABLE IF NOT EXISTS {} (title TEXT, source TEXT, date TEXT, link TEXT, "
+            "snippet TEXT, query TEXT, parsed_date TIMESTAMP, link_hash TEXT)"
+        ).format(ident),
+        sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS link_hash TEXT").format(ident),
+        sql.SQL(
+            "UPDATE {t} SET link_hash = md5(btrim(link)) WHERE ctid IN ("
+            "SELECT DISTINCT ON (btrim(link)) ctid FROM {t} WHERE link_hash IS NULL AND link IS NOT NULL "
+            "AND md5(btrim(link)) NOT IN (SELECT link_hash FROM {t} WHERE link_hash IS NOT NULL) "
+            "ORDER BY btrim(link), ctid)"
+        ).format(t=ident),
+        sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ON {} (link_hash)").format(
+            sql.Identifier(f"{table}_link_hash_key"), ident
+        ),
+    ]
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+    conn.commit()
+
+
+def upsert_articles(conn, df, table, page_size=INSERT_PAGE_SIZE):
+    # Insert bulk; artikel yang link_hash-nya sudah ada dilewati. Return jumlah baris baru.
+    if df.empty:
+        return 0
+    df = df[ARTICLE_COLUMNS].astype(object)
+    rows = df.where(df.notna(), None).itertuples(index=False, name=None)
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s ON CONFLICT (link_hash) DO NOTHING RETURNING 1").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, ARTICLE_COLUMNS))
+    )
+    try:
+        with conn.cursor() as cursor:
+            inserted = execute_values(cursor, query.as_string(cursor), rows, page_size=page_size, fetch=True)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(inserted)
@@ -0,0 +1,174 @@
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from arrow_fetch import arrow_types_from_description, pandas_rows_to_table, rows_to_arrow
+
+# Jumlah baris per fetchmany / row group Parquet
+DEFAULT_BATCH_SIZE = 50000
+
+# File hasil disimpan di memori sampai ukuran ini, setelah itu otomatis pindah ke disk
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+# Jumlah query yang dijalankan bersamaan (= jumlah maksimum koneksi di pool)
+DEFAULT_MAX_WORKERS = 4
+
+
+def download_reader(file):
+    # Reader untuk st.download_button tanpa getvalue()/read() di app: spooled file dipindah
+    # ke disk (fileno() memicu rollover), Streamlit membaca dari file itu. Reader berbagi
+    # descriptor dengan `file`, jadi dipakai sebelum `file` ditutup.
+    fd = file.fileno()
+    file.seek(0)
+    return open(fd, "rb", closefd=False)
+
+
+class ParquetExport:
+    # Hasil export satu query: file Parquet (spooled temp file) + ringkasan
+    def __init__(self, query, file, n_rows, preview):
+        self.query = query
+        self.file = file
+        self.n_rows = n_rows
+        self.preview = preview
+
+    @property
+    def n_bytes(self):
+        self.file.seek(0, 2)
+        return self.file.tell()
+
+    def reader(self):
+        return download_reader(self.file)
+
+    def close(self):
+        self.file.close()
+
+
+def _writable_schema(schema):
+    # Kolom yang seluruhnya NULL di batch pertama belum punya tipe; pakai string
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ])
+
+
+def stream_query_to_parquet(conn, query, batch_size=DEFAULT_BATCH_SIZE, preview_rows=5, on_batch=None,
+                            fetch_mode="arrow"):
+    # Fetch dengan cursor.fetchmany dan tulis tiap batch sebagai satu row group,
+    # jadi memori puncak sebanding dengan satu batch, bukan seluruh hasil query.
+    # on_batch(rows_fetched, bytes_written) dipanggil setelah tiap batch.
+    # fetch_mode "arrow": tipe kolom dari metadata JDBC; "pandas": jalur DataFrame lama.
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    cursor = conn.cursor()
+    writer = None
+    n_rows = 0
+    preview = None
+    try:
+        cursor.execute(query)
+        columns = [desc[0] for desc in cursor.description]
+        column_types = arrow_types_from_description(cursor.description)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if fetch_mode == "arrow":
+                table = rows_to_arrow(rows, column_types)
+            else:
+                table = pandas_rows_to_table(rows, columns)
+            if writer is None:
+                writer = pq.ParquetWriter(out, _writable_schema(table.schema))
+                preview = table.slice(0, preview_rows).to_pandas()
+            writer.write_table(table.cast(writer.schema))
+            n_rows += len(rows)
+            if on_batch is not None:
+                on_batch(n_rows, out.tell())
+
+        if writer is None:
+            # Hasil kosong: tetap hasilkan file Parquet dengan nama (dan tipe jika diketahui) kolom
+            writer = pq.ParquetWriter(out, pa.schema([
+                (name, arrow_type or pa.string()) for name, arrow_type in column_types
+            ]))
+            preview = pd.DataFrame(columns=columns)
+    except Exception:
+        out.close()
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+
+    out.seek(0)
+    return ParquetExport(query, out, n_rows, preview)
+
+
+def create_zip_from_exports(exports, file_names):
+    # Salin file Parquet ke ZIP per chunk (tanpa getvalue() per file). Parquet sudah
+    # terkompresi, jadi disimpan tanpa deflate ulang.
+    zip_out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with zipfile.ZipFile(zip_out, "w", zipfile.ZIP_STORED, allowZip64=True) as zip_file:
+        for export, name in zip(exports, file_names):
+            export.file.seek(0)
+            with zip_file.open(f"{name}.parquet", "w", force_zip64=True) as dst:
+                shutil.copyfileobj(export.file, dst, 1 << 20)
+    zip_out.seek(0)
+    return zip_out
+
+
+class QueryResult:
+    # Status satu query di eksekusi paralel; rows/bytes diperbarui per batch oleh worker
+    def __init__(self, index, query):
+        self.index = index
+        self.query = query
+        self.status = "pending"
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.export = None
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+
+def run_queries_parallel(pool, queries, batch_size=DEFAULT_BATCH_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                         on_progress=None, poll_interval=0.2):
+    # Jalankan query bersamaan di thread pool, masing-masing streaming ke Parquet
+    # dengan koneksi dari pool. Error disimpan per query, tidak menghentikan batch.
+    # on_progress(results) dipanggil dari thread pemanggil (aman untuk Streamlit).
+    results = [QueryResult(i, query) for i, query in enumerate(queries)]
+
+    def work(result):
+        start = time.perf_counter()
+        result.status = "running"
+
+        def on_batch(rows, n_bytes):
+            result.rows = rows
+            result.bytes = n_bytes
+
+        try:
+            with pool.connection() as conn:
+                result.export = stream_query_to_parquet(conn, result.query, batch_size, on_batch=on_batch)
+            result.rows = result.export.n_rows
+            result.bytes = result.export.n_bytes
+            result.status = "done"
+        except Exception as e:
+            result.error = e
+            result.status = "error"
+        finally:
+            result.seconds = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, pool.size))) as executor:
+        pending = {executor.submit(work, result) for result in results}
+        while pending:
+            _, pending = wait(pending, timeout=poll_interval)
+            if on_progress is not None:
+                on_progress(results)
+
+    return results
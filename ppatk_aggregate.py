@@ -0,0 +1,253 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Agregasi transaksi PPATK out-of-core untuk tes_ppatk.ipynb: file CSV / Parquet (bisa
+# banyak periode) dibaca per chunk, tiap task (satu file CSV atau satu row group Parquet)
+# menghasilkan agregat parsial yang lalu digabung:
+# - total NOMINAL per kolom grup (NAMA_REKENING, PROPINSI), dijumlah dalam sen (int64)
+#   sehingga exact dan tidak bergantung urutan chunk/worker. groupby().sum() float64 biasa
+#   bisa beda beberapa ULP; untuk DataFrame di memori pakai frame_totals (cara jumlah sama)
+# - jumlah baris per nilai (value_counts PROPINSI, JENIS_KELAMIN)
+# - perkiraan jumlah nilai unik (HyperLogLog) untuk kolom identitas, mis. NO_REKENING
+# Top-K rekening diambil dari total per NAMA_REKENING yang sudah digabung (exact).
+
+CHUNK_ROWS = 200_000
+
+# 2^14 register -> standard error ~0.8%
+HLL_PRECISION = 14
+
+_PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = (
+            np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+        )
+
+    @staticmethod
+    def _hash(values):
+        # Nilai yang sama harus ber-hash sama di semua chunk, apa pun dtype hasil parser
+        # (int vs float karena NaN, str vs object vs kategori)
+        values = values.dropna()
+        if values.dtype.kind == "f" and np.array_equal(values, np.floor(values)):
+            array = values.to_numpy(dtype=np.int64)
+        elif values.dtype.kind in "iub":
+            array = values.to_numpy(dtype=np.int64)
+        elif values.dtype.kind == "f":
+            array = values.to_numpy(dtype=np.float64)
+        else:
+            array = np.asarray(values.astype(str), dtype=object)
+        return pd.util.hash_array(array, categorize=True)
+
+    def add(self, values):
+        hashes = self._hash(values)
+        if not len(hashes):
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # Sisa bit (geser kiri, bit penjaga supaya tidak nol); rank = jumlah nol di depan + 1
+        rest = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            rank = np.where(
+                high > 0,
+                32 - np.floor(np.log2(high)),
+                64 - np.floor(np.log2(np.maximum(low, 1))),
+            ).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class AggregationSpec:
+    # Kolom yang diagregasi; default = analisa di tes_ppatk.ipynb.
+    # dropna=True: baris dengan null di kolom mana pun dibuang dulu (sama dengan df.dropna()).
+    def __init__(self, value_column="NOMINAL", sum_by=("NAMA_REKENING", "PROPINSI"),
+                 count_by=("PROPINSI", "JENIS_KELAMIN"), distinct=("NO_REKENING", "CUSTOMERID"),
+                 dropna=True, hll_precision=HLL_PRECISION):
+        self.value_column = value_column
+        self.sum_by = tuple(sum_by)
+        self.count_by = tuple(count_by)
+        self.distinct = tuple(distinct)
+        self.dropna = dropna
+        self.hll_precision = hll_precision
+
+    def columns(self):
+        # None = semua kolom (dropna butuh seluruh baris)
+        if self.dropna:
+            return None
+        return list(dict.fromkeys((self.value_column,) + self.sum_by + self.count_by + self.distinct))
+
+
+def _merge_series(left, right):
+    if left is None:
+        return right
+    return pd.concat([left, right]).groupby(level=0, sort=False).sum()
+
+
+def _to_cents(values):
+    # NOMINAL rupiah (maks. 2 desimal) -> int64 sen; None jika ada nilai yang tidak pas
+    cents = np.rint(values * 100)
+    if not np.array_equal(cents / 100, values) or np.abs(cents).max(initial=0) >= 2 ** 62:
+        return None
+    return cents.astype(np.int64)
+
+
+class Aggregate:
+    # Agregat parsial / gabungan. Total disimpan dalam sen (int64) selama semua nilai
+    # pas 2 desimal; jika tidak, jatuh ke float64.
+    def __init__(self, spec):
+        self.spec = spec
+        self.rows = 0
+        self.exact = True
+        self.sums = {column: None for column in spec.sum_by}
+        self.counts = {column: None for column in spec.count_by}
+        self.sketches = {column: HyperLogLog(spec.hll_precision) for column in spec.distinct}
+
+    def add_frame(self, df):
+        spec = self.spec
+        if spec.dropna:
+            df = df.dropna()
+        if df.empty:
+            return
+        self.rows += len(df)
+
+        values = df[spec.value_column].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        cents = _to_cents(np.where(valid, values, 0.0)) if self.exact else None
+        if cents is None and self.exact:
+            self._to_float()
+        amount = pd.Series(cents if self.exact else np.where(valid, values, 0.0), index=df.index)
+
+        for column in spec.sum_by:
+            keys = df[column]
+            mask = keys.notna().to_numpy()
+            partial = amount[mask].groupby(np.asarray(keys[mask].astype(str), dtype=object), sort=False).sum()
+            self.sums[column] = _merge_series(self.sums[column], partial)
+        for column in spec.count_by:
+            partial = df[column].astype(str).where(df[column].notna()).value_counts(dropna=True)
+            partial.index = partial.index.astype(object)
+            self.counts[column] = _merge_series(self.counts[column], partial)
+        for column in spec.distinct:
+            self.sketches[column].add(df[column])
+
+    def _to_float(self):
+        if not self.exact:
+            return
+        self.exact = False
+        for column, sums in self.sums.items():
+            if sums is not None:
+                self.sums[column] = sums / 100
+
+    def merge(self, other):
+        if self.exact != other.exact:
+            self._to_float()
+            other._to_float()
+        self.rows += other.rows
+        for column in self.sums:
+            self.sums[column] = _merge_series(self.sums[column], other.sums[column])
+        for column in self.counts:
+            self.counts[column] = _merge_series(self.counts[column], other.counts[column])
+        for column in self.sketches:
+            self.sketches[column].merge(other.sketches[column])
+        return self
+
+    # --- Hasil (format sama dengan tabel di notebook) ---
+
+    def totals(self, column):
+        # DataFrame [column, NOMINAL] urut NOMINAL terbesar
+        sums = self.sums[column]
+        if sums is None:
+            sums = pd.Series(dtype=np.int64 if self.exact else np.float64)
+        values = sums.to_numpy() / 100 if self.exact else sums.to_numpy(dtype=np.float64)
+        result = pd.DataFrame({column: sums.index.to_numpy(dtype=object), self.spec.value_column: values})
+        return result.sort_values(
+            [self.spec.value_column, column], ascending=[False, True], ignore_index=True
+        )
+
+    def top_accounts(self, k=10, column="NAMA_REKENING"):
+        return self.totals(column).head(k)
+
+    def value_counts(self, column):
+        # DataFrame [column, jumlah] seperti value_counts().reset_index() di notebook
+        counts = self.counts[column]
+        if counts is None:
+            counts = pd.Series(dtype=np.int64)
+        result = pd.DataFrame({column: counts.index.to_numpy(dtype=object), "jumlah": counts.to_numpy(dtype=np.int64)})
+        return result.sort_values(["jumlah", column], ascending=[False, True], ignore_index=True)
+
+    def distinct_count(self, column):
+        # Perkiraan (HyperLogLog), bukan nilai exact
+        return self.sketches[column].estimate()
+
+
+def is_parquet(path):
+    return path.lower().endswith(_PARQUET_EXTENSIONS)
+
+
+def plan_tasks(paths):
+    # Satu task per file CSV, satu task per row group Parquet
+    tasks = []
+    for path in paths:
+        if is_parquet(path):
+            tasks.extend((path, i) for i in range(pq.ParquetFile(path).num_row_groups))
+        else:
+            tasks.append((path, None))
+    return tasks
+
+
+def aggregate_task(task, spec, chunk_rows=CHUNK_ROWS):
+    path, row_group = task
+    aggregate = Aggregate(spec)
+    columns = spec.columns()
+    if row_group is not None:
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, row_groups=[row_group], columns=columns):
+            aggregate.add_frame(batch.to_pandas())
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, usecols=columns):
+            aggregate.add_frame(chunk)
+    return aggregate
+
+
+def aggregate_files(paths, spec=None, workers=None, chunk_rows=CHUNK_ROWS):
+    # Gabungan agregat semua file. workers=1 -> dijalankan di proses ini (tanpa pool).
+    spec = spec or AggregationSpec()
+    tasks = plan_tasks(paths)
+    workers = workers or os.cpu_count() or 1
+    result = Aggregate(spec)
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            result.merge(aggregate_task(task, spec, chunk_rows))
+        return result
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(aggregate_task, task, spec, chunk_rows) for task in tasks]
+        for future in as_completed(futures):
+            result.merge(future.result())
+    return result
+
+
+def frame_totals(df, column, value_column="NOMINAL"):
+    # Total per grup dari DataFrame di memori, format dan cara jumlah (sen) sama dengan
+    # Aggregate.totals, jadi hasilnya bisa dibandingkan persis dengan aggregate_files
+    spec = AggregationSpec(value_column=value_column, sum_by=(column,), count_by=(), distinct=(), dropna=False)
+    aggregate = Aggregate(spec)
+    aggregate.add_frame(df)
+    return aggregate.totals(column)
@@ -0,0 +1,21 @@
+import threading
+import time
+
+
+class RateLimiter:
+    # Jarak minimal antar request, dibagi semua thread (bukan sleep tetap per item).
+    # Dipakai news_collector (request Google News) dan whatsapp_dispatch (pengiriman pesan).
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
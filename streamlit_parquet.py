@@ -5,9 +5,12 @@ import pyarrow.parquet as pq
 import pyarrow as pa
 import os
 from io import BytesIO
-import time
 import zipfile
 import re
+from db_pool import ConnectionPool
+from parquet_export import (
+    DEFAULT_BATCH_SIZE, DEFAULT_MAX_WORKERS, create_zip_from_exports, download_reader, run_queries_parallel
+)
 
 # Database connection details
 dsn_database = "DWHDBPRD"
@@ -42,6 +45,22 @@ def execute_queries(queries):
         conn.close()
     return results
 
+# Connection pool shared across reruns (one connection per parallel query)
+@st.cache_resource
+def get_connection_pool(size):
+    return ConnectionPool(connect_to_netezza, size)
+
+# Progress table for parallel execution
+def progress_frame(results):
+    return pd.DataFrame([{
+        "Query": r.index + 1,
+        "Table": extract_table_name(r.query),
+        "Status": r.status,
+        "Rows": r.rows,
+        "MB written": round(r.bytes / 1024 / 1024, 2),
+        "Seconds": round(r.seconds, 1) if r.finished else None,
+    } for r in results])
+
 # Function to save DataFrame as Parquet file in buffer
 def save_as_parquet_to_buffer(df):
     try:
@@ -79,6 +98,14 @@ def main():
         height=200
     )
 
+    streaming = st.checkbox("Streaming export (hemat memori, untuk tabel besar)", value=True)
+    batch_size = st.number_input(
+        "Batch size (baris per fetch / row group)", min_value=1000, value=DEFAULT_BATCH_SIZE, step=10000
+    )
+    max_workers = st.number_input(
+        "Query paralel (jumlah koneksi)", min_value=1, max_value=16, value=DEFAULT_MAX_WORKERS
+    )
+
     if st.button("Execute Queries"):
         queries = [q.strip() for q in query_input.split(';') if q.strip()]
         if not queries:
@@ -92,6 +119,52 @@ def main():
         progress_step = 100 / len(queries)
         current_progress = 0
 
+        if streaming:
+            pool = get_connection_pool(int(max_workers))
+            status_table = st.empty()
+
+            def on_progress(results):
+                finished = sum(r.finished for r in results)
+                progress_bar.progress(int(finished * 100 / len(results)))
+                status_table.dataframe(progress_frame(results), hide_index=True)
+
+            results = run_queries_parallel(
+                pool, queries, batch_size=int(batch_size), max_workers=int(max_workers), on_progress=on_progress
+            )
+            progress_bar.progress(100)
+
+            exports = []
+            for result in results:
+                i = result.index
+                if result.error is not None:
+                    st.error(f"Error executing query {i + 1}: {result.error}")
+                    continue
+                export = result.export
+                st.write(f"Query {i + 1} Results ({export.n_rows} rows):", export.preview)
+                file_name = f"{extract_table_name(result.query)}_{i+1}"
+                exports.append(export)
+                file_names.append(file_name)
+
+                st.download_button(
+                    label=f"Download Parquet for Query {i + 1}",
+                    data=export.reader(),
+                    file_name=f"{file_name}.parquet",
+                    mime="application/octet-stream"
+                )
+
+            if exports:
+                zip_file = create_zip_from_exports(exports, file_names)
+                st.download_button(
+                    label="Download All Parquet Files as ZIP",
+                    data=download_reader(zip_file),
+                    file_name="all_queries_parquet.zip",
+                    mime="application/zip"
+                )
+                zip_file.close()
+            for export in exports:
+                export.close()
+            return
+
         results = execute_queries(queries)
         
         for i, (query, df) in enumerate(results):
@@ -116,7 +189,6 @@ def main():
             
             current_progress += progress_step
             progress_bar.progress(min(int(current_progress), 100))
-            time.sleep(0.5)  # Simulate processing time
 
         progress_bar.progress(100)
 
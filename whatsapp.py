@@ -1,17 +1,49 @@
+import argparse
+
 import pandas as pd
-import pywhatkit as kit
+
+from whatsapp_dispatch import (
+    DEFAULT_CHECKPOINT, Checkpoint, Dispatcher, FakeSender, PywhatkitSender, build_messages, campaign_id,
+)
 
 # Membaca data dari file Excel
 # Pastikan file 'contacts.xlsx' berada di direktori yang sama dengan script atau berikan path yang benar
-df = pd.read_excel('C:/Users/......../Documents/Coding/Muamalat/Whatsapp Blast/contacts.xlsx')
+CONTACTS_FILE = 'C:/Users/......../Documents/Coding/Muamalat/Whatsapp Blast/contacts.xlsx'
+
+# Placeholder = nama kolom di file Excel (mis. {Name})
+MESSAGE_TEMPLATE = "Hello {Name}, this message is sent to you just for test. hehehe. Happy nice day!"
+
+parser = argparse.ArgumentParser(description="Kirim pesan WhatsApp ke semua kontak (bisa dilanjutkan)")
+parser.add_argument("--contacts", default=CONTACTS_FILE)
+parser.add_argument("--template", default=MESSAGE_TEMPLATE)
+parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="file SQLite progres kirim")
+parser.add_argument("--backend", choices=["pywhatkit", "fake"], default="pywhatkit")
+parser.add_argument("--rate", type=float, default=None, help="maksimal pesan per detik")
+parser.add_argument("--concurrency", type=int, default=1, help="jumlah worker (pywhatkit selalu 1)")
+parser.add_argument("--max-attempts", type=int, default=3)
+args = parser.parse_args()
+
+df = pd.read_excel(args.contacts)
+messages = build_messages(df, args.template, phone_column='Phone')
+
+sender = PywhatkitSender() if args.backend == "pywhatkit" else FakeSender(latency=0.05)
+checkpoint = Checkpoint(args.checkpoint)
+campaign = campaign_id(args.template)
 
-# Loop untuk mengirim pesan ke setiap nomor
-for index, row in df.iterrows():
-    name = row['Name']  # Nama kolom harus sesuai dengan yang ada di file Excel
-    number = row['Phone']  # Nama kolom harus sesuai dengan yang ada di file Excel
-    message = f"Hello {name}, this message is sent to you just for test. hehehe. Happy nice day!"
+def show_progress(phone, stats):
+    done = stats.sent + stats.failed
+    if done % 50 == 0:
+        print(f"{done} pesan diproses ({stats.sent} terkirim, {stats.failed} gagal)")
 
-    # Mengirim pesan
-    kit.sendwhatmsg_instantly(f"+{number}", message)
+# Nomor yang sudah terkirim untuk template ini (menurut checkpoint) dilewati;
+# yang gagal dicoba ulang dengan backoff
+dispatcher = Dispatcher(
+    sender, checkpoint, rate_per_second=args.rate, concurrency=args.concurrency,
+    max_attempts=args.max_attempts, progress=show_progress
+)
+stats = dispatcher.run(messages, campaign)
+print(f"Ringkasan kampanye {campaign}: {stats.as_dict()}")
+print(f"Status di checkpoint: {checkpoint.summary(campaign)}")
+checkpoint.close()
 
 print("Pesan telah dikirim ke semua kontak.")
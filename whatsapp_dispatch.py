@@ -0,0 +1,230 @@
+import hashlib
+import random
+import re
+import sqlite3
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rate_limit import RateLimiter
+
+# Antrian kirim pesan WhatsApp untuk whatsapp.py:
+# - backend pengirim bisa diganti (pywhatkit untuk kirim sungguhan, FakeSender untuk tes/benchmark)
+# - batas pesan per detik + jumlah worker paralel, retry dengan backoff eksponensial
+# - progres disimpan per nomor di SQLite (Checkpoint), jadi run yang terhenti bisa
+#   dilanjutkan tanpa mengirim ulang ke nomor yang sudah berhasil
+
+DEFAULT_CHECKPOINT = "whatsapp_checkpoint.sqlite"
+
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+
+class PywhatkitSender:
+    # pywhatkit mengendalikan satu jendela browser, jadi tidak bisa paralel
+    max_concurrency = 1
+
+    def __init__(self, wait_time=15, close_time=3):
+        import pywhatkit
+
+        self._kit = pywhatkit
+        self.wait_time = wait_time
+        self.close_time = close_time
+
+    def send(self, phone, message):
+        self._kit.sendwhatmsg_instantly(
+            f"+{phone}", message, wait_time=self.wait_time, tab_close=True, close_time=self.close_time
+        )
+
+
+class FakeSender:
+    # Backend lokal: hanya menunggu `latency` detik dan mencatat pesan; gagal acak dengan
+    # peluang `failure_rate` (deterministik per seed) untuk menguji retry
+    max_concurrency = None
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, phone, message):
+        time.sleep(self.latency)
+        with self._lock:
+            if self._random.random() < self.failure_rate:
+                raise RuntimeError("fake send failure")
+            self.sent[phone] = self.sent.get(phone, 0) + 1
+
+
+def normalize_phone(number):
+    # Nomor dari Excel bisa terbaca float (6281234.0); hanya digit yang dipakai
+    text = str(number).strip()
+    if text.endswith(".0"):
+        text = text[:-2]
+    return re.sub(r"\D", "", text)
+
+
+def template_fields(template):
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field]
+
+
+def campaign_id(template):
+    # Checkpoint per isi template: template baru = kampanye baru, nomor yang sama dikirimi lagi
+    return hashlib.md5(template.encode("utf-8")).hexdigest()[:12]
+
+
+def build_messages(df, template, phone_column="Phone"):
+    # List (phone, message) dari DataFrame kontak; placeholder template = nama kolom,
+    # mis. "Hello {Name}". Nomor kosong / duplikat dilewati.
+    missing = [field for field in template_fields(template) if field not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom template tidak ada di data kontak: {missing}")
+    messages = {}
+    for row in df.to_dict("records"):
+        phone = normalize_phone(row[phone_column])
+        if phone and phone not in messages:
+            messages[phone] = template.format_map(row)
+    return list(messages.items())
+
+
+class Checkpoint:
+    # Status kirim per (kampanye, nomor) di SQLite. Setiap perubahan langsung di-commit
+    # supaya progres tetap ada jika proses mati di tengah jalan.
+    def __init__(self, path=DEFAULT_CHECKPOINT):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS dispatch ("
+                "campaign TEXT NOT NULL, phone TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, latency REAL, last_error TEXT, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (campaign, phone))"
+            )
+            self._conn.commit()
+
+    def load(self, campaign):
+        # {phone: (status, attempts)}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT phone, status, attempts FROM dispatch WHERE campaign = ?", (campaign,)
+            ).fetchall()
+        return {phone: (status, attempts) for phone, status, attempts in rows}
+
+    def record(self, campaign, phone, status, attempts, latency=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO dispatch (campaign, phone, status, attempts, latency, last_error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (campaign, phone) DO UPDATE SET "
+                "status = excluded.status, attempts = excluded.attempts, latency = excluded.latency, "
+                "last_error = excluded.last_error, updated_at = excluded.updated_at",
+                (campaign, phone, status, attempts, latency, error, time.time()),
+            )
+            self._conn.commit()
+
+    def summary(self, campaign):
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM dispatch WHERE campaign = ? GROUP BY status", (campaign,)
+            ).fetchall())
+
+    def close(self):
+        self._conn.close()
+
+
+class DispatchStats:
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.retries = 0
+        self.latencies = []
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, status, attempts, latency):
+        with self._lock:
+            self.retries += attempts - 1
+            if status == STATUS_SENT:
+                self.sent += 1
+                self.latencies.append(latency)
+            else:
+                self.failed += 1
+
+    def as_dict(self):
+        latencies = np.asarray(self.latencies) * 1000
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 2),
+            "messages_per_second": round(self.sent / self.seconds, 2) if self.seconds else None,
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+            "latency_p95_ms": round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+        }
+
+
+class Dispatcher:
+    def __init__(self, sender, checkpoint, rate_per_second=None, concurrency=1,
+                 max_attempts=3, backoff=2.0, progress=None):
+        self.sender = sender
+        self.checkpoint = checkpoint
+        self.limiter = RateLimiter(rate_per_second)
+        limit = getattr(sender, "max_concurrency", None)
+        self.concurrency = min(concurrency, limit) if limit else concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.progress = progress
+
+    def _send_one(self, campaign, phone, message, attempts, stats):
+        # Kirim dengan retry; attempts di checkpoint kumulatif antar run, batas max_attempts
+        # per run. Latency = durasi percobaan terakhir (tanpa antre rate limit).
+        tries = 0
+        while True:
+            tries += 1
+            self.limiter.wait()
+            start = time.perf_counter()
+            try:
+                self.sender.send(phone, message)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                if tries >= self.max_attempts:
+                    self.checkpoint.record(campaign, phone, STATUS_FAILED, attempts + tries, latency, str(e))
+                    stats.add(STATUS_FAILED, tries, latency)
+                    break
+                time.sleep(self.backoff * 2 ** (tries - 1))
+                continue
+            latency = time.perf_counter() - start
+            self.checkpoint.record(campaign, phone, STATUS_SENT, attempts + tries, latency)
+            stats.add(STATUS_SENT, tries, latency)
+            break
+        if self.progress is not None:
+            self.progress(phone, stats)
+
+    def run(self, messages, campaign):
+        # messages: list (phone, message). Nomor yang sudah terkirim di kampanye ini dilewati;
+        # nomor yang belum dikirim atau gagal di run sebelumnya dicoba (lagi).
+        done = self.checkpoint.load(campaign)
+        stats = DispatchStats()
+        pending = []
+        for phone, message in messages:
+            status, attempts = done.get(phone, (None, 0))
+            if status == STATUS_SENT:
+                stats.skipped += 1
+            else:
+                pending.append((phone, message, attempts))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(self.concurrency, 1)) as pool:
+            futures = [
+                pool.submit(self._send_one, campaign, phone, message, attempts, stats)
+                for phone, message, attempts in pending
+            ]
+            for future in futures:
+                future.result()
+        stats.seconds = time.perf_counter() - start
+        return stats
@@ -0,0 +1,300 @@
+import argparse
+import bisect
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from psycopg2 import sql
+
+from xmeta_search import CODE_COLUMN, NAME_COLUMN, TABLE
+
+# Index identifier offline untuk kode Orchestrate DataStage (tabel xmeta):
+# tiap job (name_xmeta) dipecah jadi identifier (schema.table, nama stage, #parameter#),
+# disimpan sebagai postings (term -> id job) di file .npy yang di-memory-map.
+# Refresh inkremental: hanya job yang digest kodenya berubah yang diambil ulang.
+#
+#   python -m xmeta_index refresh --dsn "host=... dbname=... user=..."
+#   python -m xmeta_index query "mismartprd AND bmidwh"
+
+INDEX_DIR = ".xmeta_index"
+INDEX_VERSION = 1
+
+# Identifier, boleh bertitik (schema.table) dan berisi # atau $ (parameter job)
+_IDENTIFIER = re.compile(r"[A-Za-z_#$][\w#$]*(?:\.[A-Za-z_#$][\w#$]*)*")
+_QUERY_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+
+def tokenize(code):
+    # Set identifier lowercase; "bmidwh.actb" juga menghasilkan "bmidwh" dan "actb"
+    tokens = set()
+    for match in _IDENTIFIER.finditer(code):
+        identifier = match.group().lower()
+        tokens.add(identifier)
+        if "." in identifier:
+            tokens.update(identifier.split("."))
+    return {token for token in tokens if len(token) > 1}
+
+
+class XmetaIndex:
+    # names/digests per job; terms terurut; postings[offsets[t]:offsets[t+1]] = id job (terurut) term t
+    def __init__(self, names, digests, terms, offsets, postings):
+        self.names = names
+        self.digests = digests
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.names)
+
+    def term_ids(self, term):
+        # "bmidwh.*" -> semua term berawalan "bmidwh."; selain itu term persis
+        if term.endswith("*"):
+            prefix = term[:-1]
+            lo = bisect.bisect_left(self.terms, prefix)
+            hi = bisect.bisect_left(self.terms, prefix + "\uffff")
+            return range(lo, hi)
+        i = bisect.bisect_left(self.terms, term)
+        return [i] if i < len(self.terms) and self.terms[i] == term else []
+
+    def lookup(self, term):
+        ids = [np.asarray(self.postings[self.offsets[t]:self.offsets[t + 1]]) for t in self.term_ids(term.lower())]
+        if not ids:
+            return np.empty(0, dtype=np.int32)
+        return ids[0] if len(ids) == 1 else np.unique(np.concatenate(ids))
+
+    def query(self, expr):
+        # AND / OR (case-insensitive) dan kurung; spasi antar term = AND.
+        # Return nama job yang cocok, terurut.
+        tokens = _QUERY_TOKEN.findall(expr)
+        if not tokens:
+            return []
+        pos = 0
+
+        def parse_or():
+            nonlocal pos
+            result = parse_and()
+            while pos < len(tokens) and tokens[pos].upper() == "OR":
+                pos += 1
+                result = np.union1d(result, parse_and())
+            return result
+
+        def parse_and():
+            nonlocal pos
+            result = parse_term()
+            while pos < len(tokens) and tokens[pos] != ")" and tokens[pos].upper() != "OR":
+                if tokens[pos].upper() == "AND":
+                    pos += 1
+                result = np.intersect1d(result, parse_term(), assume_unique=True)
+            return result
+
+        def parse_term():
+            nonlocal pos
+            if pos >= len(tokens):
+                raise ValueError(f"Query tidak lengkap: {expr!r}")
+            token = tokens[pos]
+            pos += 1
+            if token == "(":
+                result = parse_or()
+                if pos >= len(tokens) or tokens[pos] != ")":
+                    raise ValueError(f"Kurung tidak ditutup: {expr!r}")
+                pos += 1
+                return result
+            if token == ")" or token.upper() in ("AND", "OR"):
+                raise ValueError(f"Token tidak terduga {token!r} di {expr!r}")
+            return self.lookup(token)
+
+        ids = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f"Token tidak terduga {tokens[pos]!r} di {expr!r}")
+        return sorted(self.names[i] for i in ids)
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR):
+        # Postings dan offsets di-memory-map; hanya daftar nama dan term yang dibaca ke memori
+        with open(os.path.join(index_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["version"] != INDEX_VERSION:
+            raise ValueError(f"Versi index {manifest['version']} tidak didukung")
+        prefix = os.path.join(index_dir, manifest["generation"])
+        with open(f"{prefix}.docs.json", encoding="utf-8") as f:
+            docs = json.load(f)
+        with open(f"{prefix}.terms.txt", encoding="utf-8") as f:
+            content = f.read()
+        terms = content.split("\n") if content else []
+        return cls(
+            docs["names"],
+            docs["digests"],
+            terms,
+            np.load(f"{prefix}.offsets.npy", mmap_mode="r"),
+            np.load(f"{prefix}.postings.npy", mmap_mode="r"),
+        )
+
+    def save(self, index_dir=INDEX_DIR):
+        # File generasi baru ditulis dulu, lalu manifest diganti dengan os.replace;
+        # pembaca yang sedang memakai generasi lama tidak terganggu.
+        os.makedirs(index_dir, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        prefix = os.path.join(index_dir, generation)
+        with open(f"{prefix}.docs.json", "w", encoding="utf-8") as f:
+            json.dump({"names": self.names, "digests": self.digests}, f)
+        with open(f"{prefix}.terms.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(self.terms))
+        np.save(f"{prefix}.offsets.npy", np.asarray(self.offsets, dtype=np.int64))
+        np.save(f"{prefix}.postings.npy", np.asarray(self.postings, dtype=np.int32))
+
+        fd, tmp_path = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "generation": generation, "n_jobs": len(self.names),
+                       "n_terms": len(self.terms), "built_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+        os.replace(tmp_path, os.path.join(index_dir, "manifest.json"))
+
+        # Bersihkan generasi lama (di Windows file yang masih di-mmap gagal dihapus; dicoba lagi nanti)
+        for file_name in os.listdir(index_dir):
+            if file_name != "manifest.json" and not file_name.startswith(generation):
+                try:
+                    os.remove(os.path.join(index_dir, file_name))
+                except OSError:
+                    pass
+
+
+def update_index(index, digests, documents):
+    # digests: {name_xmeta: digest} kondisi terbaru di database.
+    # documents: (name_xmeta, kode) untuk job yang baru / digest-nya berubah.
+    # Return (index_baru, ringkasan perubahan).
+    new_tokens = {}
+    for name, code in documents:
+        new_tokens.setdefault(name, set()).update(tokenize(code or ""))
+
+    keep = [i for i, name in enumerate(index.names)
+            if name not in new_tokens and digests.get(name) == index.digests[i]]
+    names = [index.names[i] for i in keep] + list(new_tokens)
+    old_names = set(index.names)
+    stats = {
+        "unchanged": len(keep),
+        "added": sum(1 for name in new_tokens if name not in old_names),
+        "changed": sum(1 for name in new_tokens if name in old_names),
+        "removed": len(old_names - set(digests)),
+    }
+
+    vocab = sorted(set(index.terms).union(*new_tokens.values()))
+    term_pos = {term: i for i, term in enumerate(vocab)}
+
+    # Pasangan (term, job) lama yang masih berlaku, dengan id yang dipetakan ulang
+    doc_map = np.full(len(index.names), -1, dtype=np.int64)
+    doc_map[keep] = np.arange(len(keep))
+    old_terms = np.repeat(
+        np.asarray([term_pos[term] for term in index.terms], dtype=np.int64), np.diff(index.offsets)
+    )
+    old_docs = doc_map[np.asarray(index.postings, dtype=np.int64)]
+    valid = old_docs >= 0
+
+    new_terms = []
+    new_docs = []
+    for doc_id, tokens in enumerate(new_tokens.values(), start=len(keep)):
+        new_terms.extend(term_pos[token] for token in tokens)
+        new_docs.extend([doc_id] * len(tokens))
+
+    terms = np.concatenate([old_terms[valid], np.asarray(new_terms, dtype=np.int64)])
+    docs = np.concatenate([old_docs[valid], np.asarray(new_docs, dtype=np.int64)])
+    order = np.lexsort((docs, terms))
+    terms, docs = terms[order], docs[order]
+
+    # Buang term yang tidak lagi dipakai job mana pun
+    counts = np.bincount(terms, minlength=len(vocab))
+    used = np.flatnonzero(counts)
+    offsets = np.concatenate([[0], np.cumsum(counts[used])]).astype(np.int64)
+
+    digests_out = [index.digests[i] for i in keep] + [digests.get(name) for name in new_tokens]
+    new_index = XmetaIndex(names, digests_out, [vocab[i] for i in used], offsets, docs.astype(np.int32))
+    return new_index, stats
+
+
+def fetch_digests(conn, columns):
+    # Digest kode per name_xmeta dihitung di database, jadi hanya hash yang ditransfer
+    name = sql.Identifier(columns[NAME_COLUMN])
+    code = sql.Identifier(columns[CODE_COLUMN])
+    query = sql.SQL(
+        "SELECT {name}, md5(string_agg(md5(coalesce({code}, '')), ',' ORDER BY md5(coalesce({code}, '')))) "
+        "FROM {table} GROUP BY {name}"
+    ).format(name=name, code=code, table=sql.Identifier(TABLE))
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        return dict(cursor.fetchall())
+
+
+def iter_codes(conn, columns, names, batch_size=200):
+    # Kode job untuk `names` lewat server-side cursor (CLOB tidak dimuat sekaligus)
+    query = sql.SQL("SELECT {name}, {code} FROM {table} WHERE {name} = ANY(%s)").format(
+        name=sql.Identifier(columns[NAME_COLUMN]),
+        code=sql.Identifier(columns[CODE_COLUMN]),
+        table=sql.Identifier(TABLE),
+    )
+    with conn.cursor(name="xmeta_index_codes") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query, [list(names)])
+        for row in cursor:
+            yield row
+
+
+def refresh_index(conn, index_dir=INDEX_DIR):
+    # Bandingkan digest di database dengan index lokal, ambil ulang hanya job yang berubah
+    try:
+        index = XmetaIndex.load(index_dir)
+    except (OSError, ValueError, KeyError):
+        index = XmetaIndex.empty()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("SELECT * FROM {} LIMIT 0").format(sql.Identifier(TABLE)))
+            columns = {desc[0].lower(): desc[0] for desc in cursor.description}
+        digests = fetch_digests(conn, columns)
+        known = dict(zip(index.names, index.digests))
+        changed = [name for name, digest in digests.items() if known.get(name) != digest]
+        new_index, stats = update_index(index, digests, iter_codes(conn, columns, changed))
+    finally:
+        conn.rollback()
+    if stats["added"] or stats["changed"] or stats["removed"] or not os.path.exists(
+            os.path.join(index_dir, "manifest.json")):
+        new_index.save(index_dir)
+    return new_index, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index identifier kode job DataStage (xmeta)")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    refresh_parser = sub.add_parser("refresh", help="bangun / perbarui index dari database xmeta")
+    refresh_parser.add_argument("--dsn", required=True, help="DSN psycopg2, mis. \"host=... dbname=... user=...\"")
+    query_parser = sub.add_parser("query", help="cari job, mis. \"mismartprd AND bmidwh\"")
+    query_parser.add_argument("expr")
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        import psycopg2
+
+        conn = psycopg2.connect(args.dsn)
+        try:
+            start = time.perf_counter()
+            index, stats = refresh_index(conn, args.index_dir)
+        finally:
+            conn.close()
+        print(f"{len(index)} job, {len(index.terms)} term ({time.perf_counter() - start:.1f}s): {stats}")
+    else:
+        index = XmetaIndex.load(args.index_dir)
+        start = time.perf_counter()
+        names = index.query(args.expr)
+        elapsed = (time.perf_counter() - start) * 1000
+        print("\n".join(names))
+        print(f"-- {len(names)} job ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
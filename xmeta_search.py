@@ -0,0 +1,190 @@
+import csv
+import gzip
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2 import sql
+
+from arrow_fetch import rows_to_arrow
+from db_pool import like_pattern
+
+# Pencarian CLOB Orchestrate di tabel xmeta, dijalankan di PostgreSQL:
+# kata kunci dikirim sebagai predikat ILIKE berparameter, yang diambil hanya
+# name_xmeta + potongan teks di sekitar kata kunci. Baris lengkap hanya di-stream
+# saat user meminta download.
+#
+# ILIKE '%kata%' bisa memakai index trigram (extension pg_trgm), lihat TRIGRAM_INDEX_SQL.
+
+TABLE = "ds_source_new"
+CODE_COLUMN = "orchestratecode_xmeta"
+NAME_COLUMN = "name_xmeta"
+
+# Panjang potongan teks sebelum kata kunci dan panjang total potongan
+SNIPPET_BEFORE = 60
+SNIPPET_LENGTH = 160
+
+# Jumlah baris per fetch dari server-side cursor saat export
+EXPORT_BATCH_SIZE = 200
+
+# Format download: (mime, ekstensi file)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+TRIGRAM_INDEX_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;\n"
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_code_trgm ON {TABLE} USING gin ({CODE_COLUMN} gin_trgm_ops);"
+)
+
+
+def _keywords(keywords):
+    return [keyword.strip() for keyword in keywords if keyword and keyword.strip()]
+
+
+def _query(pool, query, params=()):
+    # Koneksi dari pool; transaksi baca selalu ditutup sebelum koneksi dikembalikan
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                names = [desc[0] for desc in cursor.description]
+                rows = cursor.fetchall()
+        finally:
+            conn.rollback()
+    return pd.DataFrame(rows, columns=names)
+
+
+def resolve_columns(pool):
+    # Nama kolom asli di tabel (bisa saja huruf besar), dengan key lowercase
+    df = _query(pool, sql.SQL("SELECT * FROM {} LIMIT 0").format(sql.Identifier(TABLE)))
+    return {name.lower(): name for name in df.columns}
+
+
+def where_sql(columns, keywords):
+    # Semua kata kunci harus ada di CLOB (AND), substring case-insensitive
+    code = sql.Identifier(columns[CODE_COLUMN])
+    if not keywords:
+        return sql.SQL("TRUE"), []
+    where = sql.SQL(" AND ").join(sql.SQL("{} ILIKE %s").format(code) for _ in keywords)
+    return where, [like_pattern(keyword) for keyword in keywords]
+
+
+def search_sql(columns, keywords):
+    code = sql.Identifier(columns[CODE_COLUMN])
+    snippets = [
+        sql.SQL("substr({code}, greatest(strpos(lower({code}), lower(%s)) - {before}, 1), {length}) AS {alias}").format(
+            code=code,
+            before=sql.Literal(SNIPPET_BEFORE),
+            length=sql.Literal(SNIPPET_LENGTH),
+            alias=sql.Identifier(f"snippet_{i + 1}"),
+        )
+        for i in range(len(keywords))
+    ]
+    where, where_params = where_sql(columns, keywords)
+    query = sql.SQL("SELECT {fields} FROM {table} WHERE {where} ORDER BY {name}").format(
+        fields=sql.SQL(", ").join([sql.SQL("{} AS name_xmeta").format(sql.Identifier(columns[NAME_COLUMN]))] + snippets),
+        table=sql.Identifier(TABLE),
+        where=where,
+        name=sql.Identifier(columns[NAME_COLUMN]),
+    )
+    return query, list(keywords) + where_params
+
+
+def search(pool, columns, keywords):
+    # DataFrame name_xmeta + snippet_1..n (satu per kata kunci) untuk baris yang cocok
+    keywords = _keywords(keywords)
+    query, params = search_sql(columns, keywords)
+    return _query(pool, query, params)
+
+
+def preview(pool, columns, n=5):
+    # Pratinjau ringan: nama + awal CLOB, bukan seluruh tabel
+    query = sql.SQL("SELECT {name} AS name_xmeta, left({code}, {length}) AS code_preview FROM {table} LIMIT {n}").format(
+        name=sql.Identifier(columns[NAME_COLUMN]),
+        code=sql.Identifier(columns[CODE_COLUMN]),
+        length=sql.Literal(SNIPPET_LENGTH),
+        table=sql.Identifier(TABLE),
+        n=sql.Literal(n),
+    )
+    return _query(pool, query)
+
+
+def iter_matching_rows(pool, columns, keywords, batch_size=EXPORT_BATCH_SIZE):
+    # Yield (nama_kolom, batch_baris) baris lengkap yang cocok, lewat server-side cursor
+    # supaya hanya satu batch CLOB yang ada di memori. Koneksi pool dipegang selama generator
+    # hidup: pemakai yang berhenti di tengah harus menutupnya (contextlib.closing), supaya
+    # koneksi langsung dilepas dan tidak menunggu garbage collector.
+    keywords = _keywords(keywords)
+    where, params = where_sql(columns, keywords)
+    query = sql.SQL("SELECT * FROM {table} WHERE {where} ORDER BY {name}").format(
+        table=sql.Identifier(TABLE), where=where, name=sql.Identifier(columns[NAME_COLUMN])
+    )
+    with pool.connection() as conn:
+        try:
+            with conn.cursor(name="xmeta_export") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [desc[0].lower() for desc in cursor.description], rows
+        finally:
+            conn.rollback()
+
+
+def export_bytes(fmt, header_line, row_batches, column_names):
+    # Tulis hasil ke satu buffer bytes per batch (tanpa file sementara / encode ulang).
+    # fmt: lihat EXPORT_FORMATS. CSV: baris keterangan di atas header (format download lama);
+    # Parquet: keterangan disimpan di metadata schema ("description").
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        _write_parquet(buffer, header_line, row_batches, column_names)
+        return buffer.getvalue()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {fmt}")
+
+    raw = gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) if fmt == "csv.gz" else buffer
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    text.write(f"{header_line}\n")
+    writer = csv.writer(text, lineterminator="\n")
+    header_written = False
+    for names, rows in row_batches:
+        if not header_written:
+            writer.writerow(names)
+            header_written = True
+        writer.writerows(rows)
+    if not header_written:
+        writer.writerow(column_names)
+    text.flush()
+    text.detach()
+    if raw is not buffer:
+        raw.close()
+    return buffer.getvalue()
+
+
+def _write_parquet(out, header_line, row_batches, column_names):
+    writer = None
+    try:
+        for names, rows in row_batches:
+            table = rows_to_arrow(rows, [(name, None) for name in names])
+            if writer is None:
+                # Kolom yang seluruhnya NULL di batch pertama belum punya tipe; pakai string
+                schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ]).with_metadata({"description": header_line})
+                writer = pq.ParquetWriter(out, schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            schema = pa.schema([(name, pa.string()) for name in column_names]).with_metadata(
+                {"description": header_line}
+            )
+            writer = pq.ParquetWriter(out, schema)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -1,7 +1,15 @@
+import os
+from contextlib import closing
+
 import streamlit as st
 import pandas as pd
 import psycopg2
-from psycopg2 import sql
+
+from db_pool import ConnectionPool
+from xmeta_index import INDEX_DIR, XmetaIndex
+from xmeta_search import (
+    CODE_COLUMN, EXPORT_FORMATS, NAME_COLUMN, export_bytes, iter_matching_rows, preview, resolve_columns, search
+)
 
 # Judul aplikasi
 st.title("Pencarian dalam Data PostgreSQL Xmeta CLOB, Created by: Vito Muhammad -MIS")
@@ -13,46 +21,143 @@ db_host = "........"
 db_port = "5432"
 db_name = "......"
 
-# Establish PostgreSQL connection
-conn = psycopg2.connect(
-    dbname=db_name,
-    user=db_user,
-    password=db_password,
-    host=db_host,
-    port=db_port
-)
+POOL_SIZE = 2
+
+
+def connect():
+    return psycopg2.connect(
+        dbname=db_name,
+        user=db_user,
+        password=db_password,
+        host=db_host,
+        port=db_port
+    )
+
 
-# Create a cursor object
-cursor = conn.cursor()
+# Pool koneksi dipakai ulang antar rerun (bukan connect + SELECT * setiap rerun)
+@st.cache_resource
+def get_pool():
+    return ConnectionPool(connect, size=POOL_SIZE)
 
-# Query untuk mengambil data dari table ds_source
-query = "SELECT * FROM ds_source_new"
 
-# Read the data from PostgreSQL into a DataFrame
-df = pd.read_sql(query, conn)
+@st.cache_resource
+def get_columns(_pool):
+    return resolve_columns(_pool)
 
-# Close the connection
-cursor.close()
-conn.close()
 
-# Convert column names to lowercase
-df.columns = df.columns.str.lower()
+@st.cache_data(ttl=600, show_spinner=False)
+def cached_preview(_pool):
+    return preview(_pool, get_columns(_pool))
+
+
+# Hanya name_xmeta + potongan teks di sekitar kata kunci yang diambil dari database
+@st.cache_data(ttl=600, show_spinner="Mencari di database...")
+def cached_search(_pool, keyword1, keyword2):
+    return search(_pool, get_columns(_pool), [keyword1, keyword2])
+
+
+# File download dibuat hanya setelah diminta, lalu di-cache per (keyword1, keyword2, jenis, format)
+@st.cache_data(ttl=600, max_entries=20, show_spinner="Menyiapkan file download...")
+def cached_export(_pool, keyword1, keyword2, kind, export_format):
+    # Menambahkan header deskriptif ke file
+    search_description = f"found table related to {keyword1} and {keyword2}"
+    if kind == "names":
+        names = cached_search(_pool, keyword1, keyword2)["name_xmeta"]
+        batches = [(["name_xmeta"], [(name,) for name in names])]
+    else:
+        # closing: jika export gagal di tengah, generator ditutup dan koneksi kembali ke pool
+        with closing(iter_matching_rows(_pool, get_columns(_pool), [keyword1, keyword2])) as batches:
+            return export_bytes(export_format, search_description, batches, list(get_columns(_pool)))
+    return export_bytes(export_format, search_description, batches, list(get_columns(_pool)))
+
+
+@st.cache_data(ttl=600, max_entries=20, show_spinner="Menyiapkan file download...")
+def cached_index_export(expr, names, export_format):
+    return export_bytes(export_format, f"found table related to {expr}",
+                        [(["name_xmeta"], [(name,) for name in names])], ["name_xmeta"])
+
+
+def prepared_download(key, build, export_format, label, file_stem, kind):
+    # Tombol "Siapkan" dulu; build() (isi file) baru dipanggil setelah diminta
+    requested = st.session_state.setdefault("xmeta_exports", set())
+    mime, extension = EXPORT_FORMATS[export_format]
+    if key in requested:
+        st.download_button(
+            label,
+            data=build(),
+            file_name=f"{file_stem}{extension}",
+            mime=mime,
+            key=f"download_{kind}"
+        )
+    elif st.button(f"Siapkan: {label}", key=f"prepare_{kind}"):
+        requested.add(key)
+        st.rerun()
+
+
+def download_section(pool, keyword1, keyword2, kind, export_format, label, file_stem):
+    prepared_download(
+        (keyword1, keyword2, kind, export_format),
+        lambda: cached_export(pool, keyword1, keyword2, kind, export_format),
+        export_format, label, file_stem, kind,
+    )
+
+
+@st.cache_resource
+def load_local_index(index_dir, manifest_mtime_ns):
+    # mtime manifest ikut jadi key: index dimuat ulang setelah "python -m xmeta_index refresh"
+    return XmetaIndex.load(index_dir)
+
+
+# Index identifier lokal (xmeta_index.py), jika sudah dibangun: tanpa query ke database xmeta
+index_dir = os.environ.get("XMETA_INDEX_DIR", INDEX_DIR)
+manifest_path = os.path.join(index_dir, "manifest.json")
+search_source = "Database (substring)"
+if os.path.exists(manifest_path):
+    search_source = st.radio(
+        "Sumber pencarian", ["Index lokal (identifier)", "Database (substring)"], horizontal=True
+    )
+
+if search_source == "Index lokal (identifier)":
+    local_index = load_local_index(index_dir, os.stat(manifest_path).st_mtime_ns)
+    st.caption(
+        f"{len(local_index)} job terindeks. Gunakan AND / OR dan kurung (mis. mismartprd AND bmidwh), "
+        "awalan dengan * (mis. bmidwh.*)."
+    )
+    expr = st.text_input("Query identifier", "mismartprd AND bmidwh")
+    try:
+        names = local_index.query(expr)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+
+    st.write(f"Jumlah hasil pencarian: {len(names)}")
+    result_df = pd.DataFrame({"name_xmeta": names})
+    st.dataframe(result_df)
+    if names:
+        export_format = st.selectbox("Format download", list(EXPORT_FORMATS))
+        # Sama dengan mode database: file baru dibuat setelah tombol "Siapkan" diklik
+        prepared_download(
+            ("index", expr, export_format),
+            lambda: cached_index_export(expr, tuple(names), export_format),
+            export_format, "Download hanya NAME_XMETA", "name_xmeta", "index_names",
+        )
+    st.stop()
+
+pool = get_pool()
+columns = get_columns(pool)
 
 # Menampilkan beberapa data awal
 st.write("Pratinjau Data:")
-st.dataframe(df.head())
+st.dataframe(cached_preview(pool))
 
 # Input kata kunci pencarian
 keyword1 = st.text_input("Masukkan kata kunci pertama", "mismartprd")
 keyword2 = st.text_input("Masukkan kata kunci kedua", "bmidwh")
 
 # Pastikan kolom yang dicari ada di dalam data
-if "orchestratecode_xmeta" in df.columns:
-    # Filter data berdasarkan kata kunci
-    filtered_df = df[
-        df["orchestratecode_xmeta"].astype(str).str.contains(keyword1, na=False, case=False) &
-        df["orchestratecode_xmeta"].astype(str).str.contains(keyword2, na=False, case=False)
-    ]
+if CODE_COLUMN in columns and NAME_COLUMN in columns:
+    # Filter data berdasarkan kata kunci (ILIKE di PostgreSQL)
+    filtered_df = cached_search(pool, keyword1, keyword2)
 
     # Menampilkan jumlah hasil pencarian
     st.write(f"Jumlah hasil pencarian: {filtered_df.shape[0]}")
@@ -62,45 +167,17 @@ if "orchestratecode_xmeta" in df.columns:
     st.dataframe(filtered_df)
 
     # Menyediakan dua opsi tombol download
+    export_format = st.selectbox("Format download", list(EXPORT_FORMATS))
     col1, col2 = st.columns(2)
 
-    # Menambahkan header deskriptif ke file CSV
-    search_description = f"found table related to {keyword1} and {keyword2}"
-
-    with col1:
-        if not filtered_df.empty and "name_xmeta" in filtered_df.columns:
-            name_xmeta_df = filtered_df[["name_xmeta"]]
-            name_xmeta_df.to_csv("temp_name_xmeta.csv", index=False, encoding="utf-8-sig")
-
-            # Membuka file untuk menambahkan header keterangan
-            with open("temp_name_xmeta.csv", "r", encoding="utf-8-sig") as f:
-                csv_content = f.read()
-            
-            csv_final = f"{search_description}\n{csv_content}".encode("utf-8-sig")
-
-            st.download_button(
-                "Download hanya NAME_XMETA",
-                data=csv_final,
-                file_name="name_xmeta.csv",
-                mime="text/csv"
-            )
-
-    with col2:
-        if not filtered_df.empty:
-            filtered_df.to_csv("temp_hasil_pencarian.csv", index=False, encoding="utf-8-sig")
-
-            # Membuka file untuk menambahkan header keterangan
-            with open("temp_hasil_pencarian.csv", "r", encoding="utf-8-sig") as f:
-                csv_content = f.read()
-            
-            csv_final = f"{search_description}\n{csv_content}".encode("utf-8-sig")
-
-            st.download_button(
-                "Download semua kolom",
-                data=csv_final,
-                file_name="hasil_pencarian.csv",
-                mime="text/csv"
-            )
+    if not filtered_df.empty:
+        with col1:
+            download_section(pool, keyword1, keyword2, "names", export_format,
+                             "Download hanya NAME_XMETA", "name_xmeta")
+        with col2:
+            # Baris lengkap (termasuk CLOB) baru diambil saat diminta
+            download_section(pool, keyword1, keyword2, "full", export_format,
+                             "Download semua kolom", "hasil_pencarian")
 
 else:
     st.error("Kolom 'ORCHESTRATECODE_XMETA' tidak ditemukan dalam data.")